@@ -38,6 +38,10 @@ try:
         database_configured = True
         
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['ALUMNI_MAX_PAGE_SIZE'] = int(os.environ.get('ALUMNI_MAX_PAGE_SIZE', 100))
+    app.config['REDIS_URL'] = os.environ.get('REDIS_URL')
+    app.config['RESPONSE_CACHE_TTL'] = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+    app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
 except Exception as e:
     print(f"Database configuration error: {e}")
 
@@ -52,6 +56,11 @@ try:
     from src.models.institution import Institution, DataUploadBatch
     from src.models.invite_token import InviteToken, EmailVerification
     from src.models.alumni import Alumni, AlumniExperience
+    from src.models.alumni_stats import AlumniStat
+    from src.models.skill import Skill, AlumniSkill
+    from src.models.batch_run import BatchRun
+    from src.models.mentor_match import MentorMatch
+    from src.models.alumni_recommendation import AlumniRecommendation
     from src.models.student import Student, StudentAchievement
     from src.models.event import Event, EventRegistration
     from src.models.message import Message, ForumPost
@@ -63,6 +72,7 @@ try:
     # Import blueprints
     from src.routes.auth import auth_bp
     from src.routes.alumni_claim import alumni_claim_bp
+    from src.routes.mentorship import mentorship_bp
     from src.routes.alumni import alumni_bp
     from src.routes.events import events_bp
     from src.routes.messages import messages_bp
@@ -84,6 +94,7 @@ try:
     app.register_blueprint(institutions_bp, url_prefix='/api')
     app.register_blueprint(account_creation_bp, url_prefix='/api')
     app.register_blueprint(data_import_bp, url_prefix='/api')
+    app.register_blueprint(mentorship_bp, url_prefix='/api')
     app.register_blueprint(user_bp, url_prefix='/api')
     
     # Initialize database tables with proper order
@@ -94,6 +105,9 @@ try:
                 # Create tables in dependency order
                 db.create_all()
                 
+                from src.utils.schema import upgrade_schema
+                upgrade_schema()
+                
                 # Test the database connection
                 from sqlalchemy import text
                 db.session.execute(text('SELECT 1'))
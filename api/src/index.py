@@ -11,9 +11,18 @@ from src.models.user import db, User, UserRole, UserStatus
 from src.models.institution import Institution, DataUploadBatch
 from src.models.invite_token import InviteToken, EmailVerification
 from src.models.alumni import Alumni, AlumniExperience
+from src.models.alumni_stats import AlumniStat
+from src.models.skill import Skill, AlumniSkill
+from src.models.batch_run import BatchRun
+from src.models.mentor_match import MentorMatch
+from src.models.alumni_recommendation import AlumniRecommendation
 from src.models.student import Student, StudentAchievement
 from src.models.event import Event, EventRegistration
-from src.models.message import Message, ForumPost
+from src.models.message import (
+    Message, ForumPost, ForumLike, Conversation, mark_conversation_read, unread_counters, unread_total
+)
+from src.models.message_archive import MessageArchiveSegment, ArchivedMessage
+from src.models.announcement import Announcement, AnnouncementRead
 from src.models.job import Job, JobApplication
 from src.models.donation import Donation, DonationCampaign
 
@@ -29,6 +38,9 @@ from src.routes.institutions import institutions_bp
 from src.routes.account_creation import account_creation_bp
 from src.routes.data_import import data_import_bp
 from src.routes.alumni_claim import alumni_claim_bp
+from src.routes.mentorship import mentorship_bp
+from src.utils.schema import upgrade_schema
+from src.utils.rooms import can_join_room
 
 app = Flask(__name__)
 
@@ -106,6 +118,22 @@ else:
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SQLALCHEMY_RECORD_QUERIES'] = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
 
+# Upper bound on page size for cursor-paginated directory listings and message history
+app.config['ALUMNI_MAX_PAGE_SIZE'] = int(os.environ.get('ALUMNI_MAX_PAGE_SIZE', 100))
+app.config['MESSAGES_MAX_PAGE_SIZE'] = int(os.environ.get('MESSAGES_MAX_PAGE_SIZE', 100))
+
+# Read messages older than this move to the compressed archive (flask archive-messages)
+app.config['MESSAGE_ARCHIVE_AFTER_DAYS'] = int(os.environ.get('MESSAGE_ARCHIVE_AFTER_DAYS', 365))
+
+# Directory response cache; shared across workers when REDIS_URL is set
+app.config['REDIS_URL'] = os.environ.get('REDIS_URL')
+app.config['RESPONSE_CACHE_TTL'] = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+
+# Without REDIS_URL each worker keeps its own unread counters; they are
+# recomputed this often, which bounds how stale another worker's badge can be
+app.config['COUNTER_CACHE_TTL'] = int(os.environ.get('COUNTER_CACHE_TTL', 30))
+
 db.init_app(app)
 # --- END OF DATABASE CONFIGURATION ---
 
@@ -120,12 +148,14 @@ app.register_blueprint(donations_bp, url_prefix='/api')
 app.register_blueprint(institutions_bp, url_prefix='/api')
 app.register_blueprint(account_creation_bp, url_prefix='/api')
 app.register_blueprint(data_import_bp, url_prefix='/api')
+app.register_blueprint(mentorship_bp, url_prefix='/api')
 app.register_blueprint(alumni_claim_bp, url_prefix='/alumni-claim')
 
 # Create database tables within app context
 with app.app_context():
     try:
         db.create_all()
+        upgrade_schema()
         
         # Create super admin user if it doesn't exist
         super_admin = User.query.filter_by(role=UserRole.SUPER_ADMIN).first()
@@ -156,6 +186,11 @@ with app.app_context():
         print(f"Database initialization error: {e}")
         # Don't fail completely, but log the error
 
+@unread_counters.subscribe
+def push_unread_count(user_id, unread_count):
+    """Push unread total changes to the user's personal room"""
+    socketio.emit('unread_count', {'unread_count': unread_count}, room=f"user_{user_id}")
+
 # --- Socket.IO Events ---
 @socketio.on('connect')
 def handle_connect(auth):
@@ -175,10 +210,18 @@ def handle_connect(auth):
     # Update user's last active time
     user.update_last_active()
     
+    # Personal room for notifications and unread count pushes
+    join_room(f"user_{user_id}")
+    
+    # Institution room, where each announcement is broadcast once
+    if user.institution_id is not None:
+        join_room(f"institution_{user.institution_id}")
+    
     emit('connected', {
         'message': 'Connected to WebSocket',
         'user_id': user_id,
-        'username': user.username
+        'username': user.username,
+        'unread_count': unread_counters.get(user_id, compute=lambda: unread_total(user_id))
     })
 
 @socketio.on('join')
@@ -194,14 +237,11 @@ def on_join(data):
     
     room = data.get('room')
     if room:
-        # Validate room access (e.g., same institution for private rooms)
-        room_type = data.get('room_type', 'conversation')
-        
-        if room_type == 'conversation':
-            # For conversation rooms, check if user can access this conversation
-            conversation_participants = room.split('_')  # Format: "user1_user2"
-            if str(user_id) not in conversation_participants:
-                return  # User not part of this conversation
+        # Personal and institution rooms are joined on connect and only ever
+        # the user's own; conversation rooms only by their participants
+        if not can_join_room(user, room, data.get('room_type', 'conversation')):
+            emit('error', {'message': 'Cannot join room'})
+            return
         
         join_room(room)
         user.update_last_active()
@@ -282,6 +322,7 @@ def handle_message(data):
         
         payload = {
             'id': msg.id,
+            'conversation_id': msg.conversation_id,
             'content': msg.content,
             'sender_id': msg.sender_id,
             'recipient_id': msg.recipient_id,
@@ -296,5 +337,32 @@ def handle_message(data):
         emit('error', {'message': 'Failed to send message'})
         print(f"Message sending error: {e}")
 
+@socketio.on('read')
+def handle_read(data):
+    """Advance the reader's watermark and broadcast the read receipt"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return
+    
+    conversation = Conversation.query.get(data.get('conversation_id'))
+    if not conversation or user_id not in (conversation.user_low_id, conversation.user_high_id):
+        emit('error', {'message': 'Conversation not found'})
+        return
+    
+    # Plain message ids only; bool is an int subclass but never a message id
+    up_to = data.get('message_id')
+    if up_to is not None and (not isinstance(up_to, int) or isinstance(up_to, bool)):
+        emit('error', {'message': 'message_id must be a message id'})
+        return
+    
+    watermark = mark_conversation_read(conversation, user_id, up_to)
+    db.session.commit()
+    
+    emit('messages_read', {
+        'conversation_id': conversation.id,
+        'reader_id': user_id,
+        'last_read_message_id': watermark
+    }, room=f"conversation_{conversation.user_low_id}_{conversation.user_high_id}")
+
 # NOTE: The static file serving route and the app.run() block have been removed
 # as they are handled by Vercel's configuration.
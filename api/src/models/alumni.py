@@ -1,9 +1,40 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import load_only
 from src.models.user import db
+from src.utils.geo import geohash_encode, resolve_location
+
+def skill_names(skills):
+    """Extract skill names from a JSON skills array of strings or {name: ...} objects"""
+    names = []
+    for skill in skills or []:
+        name = skill.get('name') if isinstance(skill, dict) else skill
+        if isinstance(name, str) and name.strip():
+            names.append(name.strip())
+    return names
 
 class Alumni(db.Model):
     __tablename__ = 'alumni'
+    __table_args__ = (
+        # Keyset pagination sort keys for the directory listing
+        db.Index('ix_alumni_last_name_id', 'last_name', 'id'),
+        db.Index('ix_alumni_created_at_id', 'created_at', 'id'),
+        db.Index('ix_alumni_networking_score_id', 'networking_score', 'id'),
+        db.Index('ix_alumni_profile_completeness_id', 'profile_completeness', 'id'),
+    )
+    
+    # Fields counted towards profile completeness
+    COMPLETENESS_FIELDS = (
+        'first_name', 'last_name', 'graduation_year', 'department',
+        'current_position', 'current_company', 'location', 'bio',
+        'skills', 'linkedin_url', 'profile_image'
+    )
+    SOCIAL_LINK_FIELDS = ('linkedin_url', 'twitter_url', 'github_url', 'personal_website')
+    # Any change to these invalidates the materialized scores
+    SCORE_FIELDS = COMPLETENESS_FIELDS + SOCIAL_LINK_FIELDS + ('is_mentor', 'last_profile_update')
+    # Free-text locations resolved to a place, in order of preference
+    LOCATION_FIELDS = ('location', 'work_location')
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True, index=True)
@@ -32,6 +63,11 @@ class Alumni(db.Model):
     
     # Contact and location
     location = db.Column(db.String(100), index=True)
+    # Normalized from location/work_location, see refresh_location()
+    location_place = db.Column(db.String(120), index=True)  # Canonical 'City, Region, CC'
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    geohash = db.Column(db.String(12), index=True)
     phone = db.Column(db.String(20))
     personal_email = db.Column(db.String(120))  # Personal email (different from institution email)
     
@@ -63,6 +99,7 @@ class Alumni(db.Model):
     # Engagement and activity
     last_profile_update = db.Column(db.DateTime)
     profile_completeness = db.Column(db.Integer, default=0)  # Percentage 0-100
+    networking_score = db.Column(db.Integer, default=0)  # Materialized, see refresh_scores()
     is_verified = db.Column(db.Boolean, default=False)  # Verified alumni status
     
     # Media
@@ -85,24 +122,16 @@ class Alumni(db.Model):
         current_year = datetime.now().year
         return current_year - self.graduation_year
     
+    def get_skill_names(self):
+        """Skill names from the JSON skills column (plain strings or {name: ...})"""
+        return skill_names(self.skills)
+    
     def calculate_profile_completeness(self):
         """Calculate profile completeness percentage"""
-        fields = [
-            self.first_name, self.last_name, self.graduation_year, self.department,
-            self.current_position, self.current_company, self.location, self.bio,
-            self.skills, self.linkedin_url, self.profile_image
-        ]
+        fields = [getattr(self, name) for name in self.COMPLETENESS_FIELDS]
         
         completed_fields = sum(1 for field in fields if field is not None and field != '' and field != [])
-        completeness = int((completed_fields / len(fields)) * 100)
-        
-        # Update the database field
-        if self.profile_completeness != completeness:
-            self.profile_completeness = completeness
-            self.last_profile_update = datetime.utcnow()
-            db.session.commit()
-        
-        return completeness
+        return int((completed_fields / len(fields)) * 100)
     
     def get_networking_score(self):
         """Calculate networking score based on profile activity"""
@@ -124,11 +153,41 @@ class Alumni(db.Model):
                 score += 10
         
         # Bonus for social media presence
-        social_links = [self.linkedin_url, self.twitter_url, self.github_url, self.personal_website]
+        social_links = [getattr(self, name) for name in self.SOCIAL_LINK_FIELDS]
         score += sum(5 for link in social_links if link)
         
         return min(score, 100)  # Cap at 100
     
+    def refresh_scores(self, touch=True):
+        """Recompute the materialized profile_completeness and networking_score.
+        
+        Runs automatically before an insert or an update touching SCORE_FIELDS;
+        the caller owns the transaction. With ``touch`` a completeness change
+        counts as a profile update; backfills pass False so recomputing does
+        not hand every profile the recency bonus.
+        """
+        completeness = self.calculate_profile_completeness()
+        if self.profile_completeness != completeness:
+            self.profile_completeness = completeness
+            if touch:
+                self.last_profile_update = datetime.utcnow()
+        self.networking_score = self.get_networking_score()
+    
+    def refresh_location(self):
+        """Resolve location/work_location to a gazetteer place and geohash it.
+        
+        Runs automatically before an insert or an update touching
+        LOCATION_FIELDS. Unrecognized locations clear the normalized columns.
+        """
+        place = resolve_location(*[getattr(self, name) for name in self.LOCATION_FIELDS])
+        if place is None:
+            self.location_place = self.latitude = self.longitude = self.geohash = None
+        else:
+            self.location_place = place.label
+            self.latitude = place.latitude
+            self.longitude = place.longitude
+            self.geohash = geohash_encode(place.latitude, place.longitude)
+    
     def can_be_contacted_by(self, user):
         """Check if user can contact this alumni"""
         if not self.allow_messages:
@@ -149,6 +208,47 @@ class Alumni(db.Model):
         self.last_profile_update = datetime.utcnow()
         db.session.commit()
     
+    # Columns a directory card needs (plus listing sort keys); everything
+    # else is deferred on listings
+    CARD_COLUMNS = (
+        'id', 'user_id', 'first_name', 'last_name', 'graduation_year', 'department',
+        'location', 'is_mentor', 'is_verified', 'profile_image', 'networking_score',
+        'show_professional_info', 'current_position', 'current_company', 'industry',
+        'profile_completeness', 'created_at', 'location_place'
+    )
+    
+    @classmethod
+    def card_query_options(cls):
+        """Query options that load only the directory card columns"""
+        return load_only(*[getattr(cls, name) for name in cls.CARD_COLUMNS], raiseload=True)
+    
+    def to_card_dict(self, viewer_role=None):
+        """Compact directory listing row; the full profile comes from to_dict()"""
+        data = {
+            'id': self.id,
+            'user_id': self.user_id,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'full_name': self.get_full_name(),
+            'graduation_year': self.graduation_year,
+            'department': self.department,
+            'location': self.location,
+            'location_place': self.location_place,
+            'is_mentor': self.is_mentor,
+            'is_verified': self.is_verified,
+            'profile_image': self.profile_image,
+            'networking_score': self.networking_score or 0
+        }
+        
+        if self.show_professional_info or viewer_role in ['super_admin', 'institution_admin']:
+            data.update({
+                'current_position': self.current_position,
+                'current_company': self.current_company,
+                'industry': self.industry
+            })
+        
+        return data
+    
     def to_dict(self, include_private=False, viewer_role=None):
         """Convert to dictionary with privacy controls"""
         data = {
@@ -167,6 +267,9 @@ class Alumni(db.Model):
             'honors': self.honors,
             'years_since_graduation': self.get_years_since_graduation(),
             'location': self.location,
+            'location_place': self.location_place,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'bio': self.bio,
             'skills': self.skills or [],
             'achievements': self.achievements or [],
@@ -178,7 +281,7 @@ class Alumni(db.Model):
             'allow_messages': self.allow_messages,
             'allow_job_offers': self.allow_job_offers,
             'profile_completeness': self.profile_completeness or 0,
-            'networking_score': self.get_networking_score(),
+            'networking_score': self.networking_score or 0,
             'is_verified': self.is_verified,
             'profile_image': self.profile_image,
             'cover_image': self.cover_image,
@@ -219,6 +322,71 @@ class Alumni(db.Model):
         
         return data
 
+@event.listens_for(Alumni, 'before_insert')
+def _score_new_alumni(mapper, connection, target):
+    target.refresh_scores()
+
+@event.listens_for(Alumni, 'before_update')
+def _rescore_changed_alumni(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in Alumni.SCORE_FIELDS):
+        target.refresh_scores()
+
+@event.listens_for(Alumni, 'before_insert')
+def _locate_new_alumni(mapper, connection, target):
+    target.refresh_location()
+
+@event.listens_for(Alumni, 'before_update')
+def _relocate_changed_alumni(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in Alumni.LOCATION_FIELDS):
+        target.refresh_location()
+
+def recompute_alumni_scores(batch_size=500):
+    """Recompute materialized scores for every alumni, one batch per commit.
+    
+    The networking score's recency bonus decays with time, so this should run
+    periodically (e.g. nightly) as well as after backfills. Returns the number
+    of rows whose scores changed.
+    """
+    changed = 0
+    last_id = 0
+    while True:
+        batch = Alumni.query.filter(Alumni.id > last_id).order_by(Alumni.id).limit(batch_size).all()
+        if not batch:
+            break
+        for alumni in batch:
+            before = (alumni.profile_completeness, alumni.networking_score)
+            alumni.refresh_scores(touch=False)
+            if (alumni.profile_completeness, alumni.networking_score) != before:
+                changed += 1
+        last_id = batch[-1].id
+        db.session.commit()
+        db.session.expunge_all()
+    return changed
+
+def normalize_alumni_locations(batch_size=500):
+    """Re-resolve every alumni location against the gazetteer, one batch per commit.
+    
+    Run after backfilling the columns or updating the gazetteer. Returns the
+    number of rows whose normalized location changed.
+    """
+    changed = 0
+    last_id = 0
+    while True:
+        batch = Alumni.query.filter(Alumni.id > last_id).order_by(Alumni.id).limit(batch_size).all()
+        if not batch:
+            break
+        for alumni in batch:
+            before = alumni.geohash
+            alumni.refresh_location()
+            if alumni.geohash != before:
+                changed += 1
+        last_id = batch[-1].id
+        db.session.commit()
+        db.session.expunge_all()
+    return changed
+
 class AlumniExperience(db.Model):
     __tablename__ = 'alumni_experiences'
     
@@ -0,0 +1,32 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from src.models.user import db
+
+class AlumniRecommendation(db.Model):
+    """Precomputed "people you may know" suggestions for an alumni"""
+    __tablename__ = 'alumni_recommendations'
+    __table_args__ = (
+        db.UniqueConstraint('alumni_id', 'recommended_id', name='uq_alumni_recommendations_pair'),
+        db.Index('ix_alumni_recommendations_alumni_rank', 'alumni_id', 'rank'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    alumni_id = db.Column(db.Integer, db.ForeignKey('alumni.id', ondelete='CASCADE'), nullable=False)
+    recommended_id = db.Column(db.Integer, db.ForeignKey('alumni.id', ondelete='CASCADE'), nullable=False, index=True)
+    score = db.Column(db.Float, nullable=False)  # Cosine similarity, 0-1
+    rank = db.Column(db.Integer, nullable=False)  # 1 = best suggestion
+    reasons = db.Column(db.JSON)  # What the pair has in common, for display
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<AlumniRecommendation {self.alumni_id} -> {self.recommended_id} ({self.score:.2f})>'
+    
+    def to_dict(self):
+        return {
+            'alumni_id': self.alumni_id,
+            'recommended_id': self.recommended_id,
+            'score': round(self.score, 4),
+            'rank': self.rank,
+            'reasons': self.reasons or {},
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
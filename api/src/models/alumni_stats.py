@@ -0,0 +1,159 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, select
+from src.models.user import db, User
+from src.models.alumni import Alumni
+from src.utils.upsert import upsert
+
+# Alumni without an institution are counted under this key
+NO_INSTITUTION = 0
+
+class AlumniStat(db.Model):
+    """Per-institution rollup of the alumni directory statistics.
+    
+    One row per (institution, dimension, bucket): dimension 'total' and
+    'mentors' use an empty bucket, 'graduation_year' and 'department' use the
+    value. Maintained in the same transaction as every Alumni write.
+    """
+    __tablename__ = 'alumni_stats'
+    __table_args__ = (
+        db.UniqueConstraint('institution_id', 'dimension', 'bucket', name='uq_alumni_stats_bucket'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    institution_id = db.Column(db.Integer, nullable=False, default=NO_INSTITUTION)
+    dimension = db.Column(db.String(30), nullable=False)
+    bucket = db.Column(db.String(100), nullable=False, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<AlumniStat {self.institution_id} {self.dimension}={self.bucket}: {self.count}>'
+
+def _buckets(graduation_year, department, is_mentor):
+    buckets = [('total', ''), ('graduation_year', str(graduation_year)), ('department', department or '')]
+    if is_mentor:
+        buckets.append(('mentors', ''))
+    return buckets
+
+def _institution_of(connection, user_id):
+    institution_id = connection.execute(
+        select(User.institution_id).where(User.id == user_id)
+    ).scalar()
+    return institution_id or NO_INSTITUTION
+
+def _apply(connection, deltas):
+    """Add ``deltas`` ({(institution, dimension, bucket): n}) to the rollup"""
+    table = AlumniStat.__table__
+    rows = [
+        {'institution_id': institution_id, 'dimension': dimension, 'bucket': bucket, 'count': delta}
+        for (institution_id, dimension, bucket), delta in deltas.items() if delta
+    ]
+    if rows:
+        upsert(
+            connection, table, rows,
+            index_elements=['institution_id', 'dimension', 'bucket'],
+            update={'count': lambda excluded: table.c.count + excluded.count}
+        )
+
+def _previous(state, name):
+    """Value of an attribute as of the last flush"""
+    history = state.attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.obj(), name)
+
+@event.listens_for(Alumni, 'after_insert')
+def _count_new_alumni(mapper, connection, target):
+    institution_id = _institution_of(connection, target.user_id)
+    _apply(connection, {
+        (institution_id,) + bucket: 1
+        for bucket in _buckets(target.graduation_year, target.department, target.is_mentor)
+    })
+
+@event.listens_for(Alumni, 'after_update')
+def _recount_changed_alumni(mapper, connection, target):
+    state = inspect(target)
+    fields = ('user_id', 'graduation_year', 'department', 'is_mentor')
+    if not any(state.attrs[name].history.has_changes() for name in fields):
+        return
+    
+    deltas = {}
+    old_institution = _institution_of(connection, _previous(state, 'user_id'))
+    for bucket in _buckets(*[_previous(state, name) for name in fields[1:]]):
+        key = (old_institution,) + bucket
+        deltas[key] = deltas.get(key, 0) - 1
+    new_institution = _institution_of(connection, target.user_id)
+    for bucket in _buckets(target.graduation_year, target.department, target.is_mentor):
+        key = (new_institution,) + bucket
+        deltas[key] = deltas.get(key, 0) + 1
+    _apply(connection, deltas)
+
+@event.listens_for(Alumni, 'after_delete')
+def _uncount_deleted_alumni(mapper, connection, target):
+    state = inspect(target)
+    fields = ('graduation_year', 'department', 'is_mentor')
+    institution_id = _institution_of(connection, _previous(state, 'user_id'))
+    _apply(connection, {
+        (institution_id,) + bucket: -1
+        for bucket in _buckets(*[_previous(state, name) for name in fields])
+    })
+
+@event.listens_for(User, 'after_update')
+def _move_alumni_between_institutions(mapper, connection, target):
+    history = inspect(target).attrs.institution_id.history
+    if not history.has_changes():
+        return
+    
+    row = connection.execute(
+        select(Alumni.graduation_year, Alumni.department, Alumni.is_mentor).where(Alumni.user_id == target.id)
+    ).first()
+    if row is None:
+        return
+    
+    old_institution = (history.deleted[0] if history.deleted else None) or NO_INSTITUTION
+    new_institution = target.institution_id or NO_INSTITUTION
+    deltas = {}
+    for bucket in _buckets(*row):
+        deltas[(old_institution,) + bucket] = -1
+        deltas[(new_institution,) + bucket] = 1
+    _apply(connection, deltas)
+
+def recount_alumni(connection, before, after):
+    """Move rollup counts for alumni changed outside the ORM flush (bulk UPDATEs).
+
+    ``before`` and ``after`` are sequences of (institution_id, graduation_year,
+    department, is_mentor) tuples for the same rows.
+    """
+    deltas = {}
+    for sign, rows in ((-1, before), (1, after)):
+        for institution_id, *fields in rows:
+            for bucket in _buckets(*fields):
+                key = (institution_id or NO_INSTITUTION,) + bucket
+                deltas[key] = deltas.get(key, 0) + sign
+    _apply(connection, deltas)
+
+def rebuild_alumni_stats():
+    """Recompute the rollup from the alumni table, repairing any drift"""
+    institution = db.func.coalesce(User.institution_id, NO_INSTITUTION)
+    deltas = {}
+    
+    groups = [
+        ('total', None, None),
+        ('mentors', None, Alumni.is_mentor == True),
+        ('graduation_year', Alumni.graduation_year, None),
+        ('department', Alumni.department, None),
+    ]
+    for dimension, column, condition in groups:
+        columns = [institution] + ([column] if column is not None else [])
+        query = db.session.query(*columns, db.func.count(Alumni.id)).select_from(Alumni).outerjoin(
+            User, User.id == Alumni.user_id
+        )
+        if condition is not None:
+            query = query.filter(condition)
+        for row in query.group_by(*columns).all():
+            bucket = '' if column is None else str(row[1] if row[1] is not None else '')
+            deltas[(row[0], dimension, bucket)] = row[-1]
+    
+    AlumniStat.query.delete()
+    _apply(db.session.connection(), deltas)
+    db.session.commit()
+    return len(deltas)
@@ -0,0 +1,87 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from sqlalchemy import case
+from src.models.user import db
+from src.utils.upsert import upsert
+
+class Announcement(db.Model):
+    """An institution-wide announcement, stored once.
+
+    Announcements are fanned out on read: each member's inbox merges the
+    institution's announcements with their AnnouncementRead watermark, so
+    posting one costs a single insert however large the institution is.
+    """
+    __tablename__ = 'announcements'
+    __table_args__ = (
+        # Newest-first feed and unread range counts per institution
+        db.Index('ix_announcements_institution_id', 'institution_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    institution_id = db.Column(db.Integer, db.ForeignKey('institutions.id'), nullable=False)
+    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Announcement {self.id} for institution {self.institution_id}>'
+
+    def to_dict(self, read_up_to=None):
+        return {
+            'id': self.id,
+            'institution_id': self.institution_id,
+            'author_id': self.author_id,
+            'subject': self.subject,
+            'content': self.content,
+            'is_read': read_up_to is not None and self.id <= read_up_to,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class AnnouncementRead(db.Model):
+    """A member's read watermark: the last announcement id they have seen"""
+    __tablename__ = 'announcement_reads'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    institution_id = db.Column(db.Integer, db.ForeignKey('institutions.id'), primary_key=True)
+    last_read_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AnnouncementRead {self.user_id}@{self.institution_id}: {self.last_read_id}>'
+
+def announcement_watermark(user_id, institution_id):
+    read = AnnouncementRead.query.get((user_id, institution_id))
+    return read.last_read_id if read else 0
+
+def mark_announcements_read(user_id, institution_id, up_to):
+    """Advance a member's watermark to ``up_to`` with one upsert; the caller commits"""
+    table = AnnouncementRead.__table__
+    upsert(
+        db.session.connection(), table,
+        [{'user_id': user_id, 'institution_id': institution_id, 'last_read_id': up_to, 'updated_at': datetime.utcnow()}],
+        index_elements=['user_id', 'institution_id'],
+        update={
+            'last_read_id': lambda excluded: case(
+                (table.c.last_read_id < excluded.last_read_id, excluded.last_read_id), else_=table.c.last_read_id
+            ),
+            'updated_at': lambda excluded: excluded.updated_at
+        }
+    )
+
+def announcement_summary(user_id, institution_id):
+    """Inbox entry for the institution's announcements: latest one plus unread count"""
+    if institution_id is None:
+        return None
+    watermark = announcement_watermark(user_id, institution_id)
+    latest = Announcement.query.filter_by(institution_id=institution_id).order_by(Announcement.id.desc()).first()
+    unread_count = Announcement.query.filter(
+        Announcement.institution_id == institution_id,
+        Announcement.id > watermark
+    ).count() if latest and latest.id > watermark else 0
+    return {
+        'institution_id': institution_id,
+        'unread_count': unread_count,
+        'last_read_announcement_id': watermark,
+        'latest': latest.to_dict(read_up_to=watermark) if latest else None
+    }
@@ -0,0 +1,43 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from src.models.user import db
+
+class BatchRun(db.Model):
+    """Bookkeeping for offline jobs that refresh incrementally.
+    
+    ``watermark`` is the start time of the last successful run; the next run
+    only needs to look at rows updated after it.
+    """
+    __tablename__ = 'batch_runs'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    watermark = db.Column(db.DateTime)
+    last_finished_at = db.Column(db.DateTime)
+    last_processed = db.Column(db.Integer, default=0)
+    
+    def __repr__(self):
+        return f'<BatchRun {self.name} @ {self.watermark}>'
+    
+    @classmethod
+    def get_watermark(cls, name):
+        run = cls.query.get(name)
+        return run.watermark if run else None
+    
+    @classmethod
+    def record(cls, name, started_at, processed=0):
+        """Mark a run that started at ``started_at`` as complete"""
+        run = cls.query.get(name) or cls(name=name)
+        run.watermark = started_at
+        run.last_finished_at = datetime.utcnow()
+        run.last_processed = processed
+        db.session.add(run)
+        db.session.commit()
+        return run
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'watermark': self.watermark.isoformat() if self.watermark else None,
+            'last_finished_at': self.last_finished_at.isoformat() if self.last_finished_at else None,
+            'last_processed': self.last_processed
+        }
@@ -0,0 +1,30 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from src.models.user import db
+
+class MentorMatch(db.Model):
+    """Precomputed top-k mentor suggestions for a student"""
+    __tablename__ = 'mentor_matches'
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'alumni_id', name='uq_mentor_matches_pair'),
+        db.Index('ix_mentor_matches_student_rank', 'student_id', 'rank'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id', ondelete='CASCADE'), nullable=False)
+    alumni_id = db.Column(db.Integer, db.ForeignKey('alumni.id', ondelete='CASCADE'), nullable=False, index=True)
+    score = db.Column(db.Float, nullable=False)  # Cosine similarity, 0-1
+    rank = db.Column(db.Integer, nullable=False)  # 1 = best match
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<MentorMatch student {self.student_id} -> alumni {self.alumni_id} ({self.score:.2f})>'
+    
+    def to_dict(self):
+        return {
+            'student_id': self.student_id,
+            'alumni_id': self.alumni_id,
+            'score': round(self.score, 4),
+            'rank': self.rank,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
@@ -1,13 +1,36 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import case, event, select, update
+from sqlalchemy.orm import Session
 from src.models.user import db
+from src.models.batch_run import BatchRun
+from src.utils.counters import CounterStore
+from src.utils.upsert import upsert
+
+# Characters of the latest message kept on the conversation summary
+PREVIEW_LENGTH = 200
+UNREAD_RECONCILE_JOB = 'unread_counters'
+
+# Per-user unread totals, cached and pushed to clients on change; the
+# conversations table stays the source of truth
+unread_counters = CounterStore('unread_messages')
 
 class Message(db.Model):
+    __table_args__ = (
+        # Conversation history, newest first
+        db.Index('ix_message_conversation_created', 'conversation_id', 'created_at', 'id'),
+        # Unread range counts: a recipient's messages above their read watermark
+        db.Index('ix_message_conversation_recipient', 'conversation_id', 'recipient_id', 'id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
+    # Canonical (low, high) participant pair; assigned on insert
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversations.id'))
     sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     recipient_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     subject = db.Column(db.String(200))
     content = db.Column(db.Text, nullable=False)
+    # Legacy per-row flag, no longer written; read state is the conversation watermark
     is_read = db.Column(db.Boolean, default=False)
     message_type = db.Column(db.String(20), default='direct')  # direct, forum, announcement
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -15,19 +38,322 @@ class Message(db.Model):
     def __repr__(self):
         return f'<Message {self.id} from {self.sender_id} to {self.recipient_id}>'
 
-    def to_dict(self):
+    def to_dict(self, read_up_to=None):
+        """``read_up_to`` is the recipient's read watermark in this conversation"""
         return {
             'id': self.id,
+            'conversation_id': self.conversation_id,
             'sender_id': self.sender_id,
             'recipient_id': self.recipient_id,
             'subject': self.subject,
             'content': self.content,
-            'is_read': self.is_read,
+            'is_read': self.is_read if read_up_to is None else self.id <= read_up_to,
             'message_type': self.message_type,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+def conversation_pair(user_id, other_user_id):
+    """Canonical (low, high) ordering of a conversation's two participants"""
+    return min(user_id, other_user_id), max(user_id, other_user_id)
+
+class Conversation(db.Model):
+    """Inbox summary of the messages between two users.
+    
+    One row per (user_low_id, user_high_id) pair holding the latest message
+    and, for each side, a read watermark (the last message id that side has
+    read) and an unread count. Maintained in the same transaction as every
+    Message insert and read; rebuild_conversations() repairs drift.
+    """
+    __tablename__ = 'conversations'
+    __table_args__ = (
+        db.UniqueConstraint('user_low_id', 'user_high_id', name='uq_conversations_pair'),
+        # Inbox keyset order, one index per side of the pair
+        db.Index('ix_conversations_low_activity', 'user_low_id', 'last_message_at', 'id'),
+        db.Index('ix_conversations_high_activity', 'user_high_id', 'last_message_at', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_low_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_high_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    last_message_id = db.Column(db.Integer)
+    last_sender_id = db.Column(db.Integer)
+    last_message_preview = db.Column(db.String(PREVIEW_LENGTH))
+    last_message_at = db.Column(db.DateTime, nullable=False)
+    read_low_id = db.Column(db.Integer, default=0)  # Last message id read by user_low_id
+    read_high_id = db.Column(db.Integer, default=0)  # Last message id read by user_high_id
+    unread_low = db.Column(db.Integer, nullable=False, default=0)  # Unread by user_low_id
+    unread_high = db.Column(db.Integer, nullable=False, default=0)  # Unread by user_high_id
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Conversation {self.user_low_id}-{self.user_high_id}>'
+    
+    def other_user_id(self, user_id):
+        return self.user_high_id if user_id == self.user_low_id else self.user_low_id
+    
+    def unread_count_for(self, user_id):
+        return self.unread_low if user_id == self.user_low_id else self.unread_high
+    
+    def read_up_to(self, user_id):
+        """Read watermark of participant ``user_id``"""
+        return (self.read_low_id if user_id == self.user_low_id else self.read_high_id) or 0
+    
+    def to_dict(self, user_id):
+        """Summary from the point of view of participant ``user_id``"""
+        other_user_id = self.other_user_id(user_id)
+        return {
+            'id': self.id,
+            'other_user_id': other_user_id,
+            'unread_count': self.unread_count_for(user_id),
+            'last_read_message_id': self.read_up_to(user_id),
+            'other_last_read_message_id': self.read_up_to(other_user_id),
+            'last_message': {
+                'id': self.last_message_id,
+                'sender_id': self.last_sender_id,
+                'preview': self.last_message_preview,
+                'created_at': self.last_message_at.isoformat() if self.last_message_at else None
+            },
+            'last_message_date': self.last_message_at.isoformat() if self.last_message_at else None
+        }
+
+def _side(table, conversation, user_id):
+    """(read watermark, unread counter) columns of ``user_id``'s side"""
+    if user_id == conversation.user_low_id:
+        return table.c.read_low_id, table.c.unread_low
+    return table.c.read_high_id, table.c.unread_high
+
+def conversation_id_for(connection, user_id, other_user_id):
+    """Id of the conversation between two users, creating it if needed"""
+    table = Conversation.__table__
+    low, high = conversation_pair(user_id, other_user_id)
+    lookup = select(table.c.id).where(table.c.user_low_id == low, table.c.user_high_id == high)
+    
+    conversation_id = connection.execute(lookup).scalar()
+    if conversation_id is None:
+        now = datetime.utcnow()
+        upsert(
+            connection, table,
+            [{'user_low_id': low, 'user_high_id': high, 'last_message_at': now,
+              'read_low_id': 0, 'read_high_id': 0, 'unread_low': 0, 'unread_high': 0, 'created_at': now}],
+            index_elements=['user_low_id', 'user_high_id']
+        )
+        conversation_id = connection.execute(lookup).scalar()
+    return conversation_id
+
+@event.listens_for(Message, 'before_insert')
+def _assign_conversation(mapper, connection, target):
+    if target.conversation_id is None:
+        target.conversation_id = conversation_id_for(connection, target.sender_id, target.recipient_id)
+
+@event.listens_for(Message, 'after_insert')
+def _summarize_new_message(mapper, connection, target):
+    # New ids are above every watermark, so the message is unread by its recipient
+    table = Conversation.__table__
+    low, _ = conversation_pair(target.sender_id, target.recipient_id)
+    unread = table.c.unread_low if target.recipient_id == low else table.c.unread_high
+    connection.execute(update(table).where(table.c.id == target.conversation_id).values({
+        'last_message_id': target.id,
+        'last_sender_id': target.sender_id,
+        'last_message_preview': (target.content or '')[:PREVIEW_LENGTH],
+        'last_message_at': target.created_at or datetime.utcnow(),
+        unread: unread + 1
+    }))
+
+def mark_conversation_read(conversation, user_id, up_to=None):
+    """Advance ``user_id``'s read watermark to ``up_to``; the caller commits.
+    
+    Defaults to the conversation's latest message, and is clamped to it so a
+    watermark can never cover messages that do not exist yet. The watermark
+    never moves backwards, and the unread counter is recounted as an index
+    range count in the same UPDATE; no message row is touched. Returns the new
+    watermark as far as this session knows it.
+    """
+    table = Conversation.__table__
+    message = Message.__table__
+    read, unread = _side(table, conversation, user_id)
+    
+    latest = conversation.last_message_id or 0
+    up_to = latest if up_to is None else min(up_to, latest)
+    watermark = case((db.func.coalesce(read, 0) < (up_to or 0), up_to or 0), else_=db.func.coalesce(read, 0))
+    remaining = select(db.func.count()).select_from(message).where(
+        message.c.conversation_id == table.c.id,
+        message.c.recipient_id == user_id,
+        message.c.id > watermark
+    ).scalar_subquery()
+    
+    db.session.execute(update(table).where(table.c.id == conversation.id).values({read: watermark, unread: remaining}))
+    db.session.info.setdefault('unread_recount', set()).add(user_id)
+    return max(conversation.read_up_to(user_id), up_to or 0)
+
+def unread_total(user_id):
+    """Unread messages across a user's conversations, from the maintained counters"""
+    return db.session.query(db.func.coalesce(db.func.sum(
+        case((Conversation.user_low_id == user_id, Conversation.unread_low), else_=Conversation.unread_high)
+    ), 0)).filter(
+        (Conversation.user_low_id == user_id) | (Conversation.user_high_id == user_id)
+    ).scalar()
+
+# --- Cached unread totals ---
+#
+# New messages bump the recipient's cached total and reads recount the
+# reader's; both apply only once the transaction commits.
+
+@event.listens_for(Session, 'after_flush')
+def _note_new_messages(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, Message):
+            deltas = session.info.setdefault('unread_deltas', {})
+            deltas[obj.recipient_id] = deltas.get(obj.recipient_id, 0) + 1
+
+@event.listens_for(Session, 'before_commit')
+def _recount_read_totals(session):
+    recount = session.info.pop('unread_recount', None)
+    if recount:
+        # SQL cannot be emitted after the commit, so totals are read here
+        session.flush()
+        session.info['unread_totals'] = {user_id: unread_total(user_id) for user_id in recount}
+
+@event.listens_for(Session, 'after_commit')
+def _apply_unread_changes(session):
+    totals = session.info.pop('unread_totals', {})
+    for user_id, delta in session.info.pop('unread_deltas', {}).items():
+        if user_id not in totals:
+            unread_counters.incr(user_id, delta)
+    for user_id, total in totals.items():
+        unread_counters.set(user_id, total)
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_unread_changes(session):
+    for key in ('unread_deltas', 'unread_recount', 'unread_totals'):
+        session.info.pop(key, None)
+
+def _recount_unread(connection):
+    """Recount every conversation's unread counters against the read watermarks"""
+    table = Conversation.__table__
+    message = Message.__table__
+    for user, read, unread in (
+        (table.c.user_low_id, table.c.read_low_id, table.c.unread_low),
+        (table.c.user_high_id, table.c.read_high_id, table.c.unread_high),
+    ):
+        connection.execute(update(table).values({
+            unread: select(db.func.count()).select_from(message).where(
+                message.c.conversation_id == table.c.id,
+                message.c.recipient_id == user,
+                message.c.id > db.func.coalesce(read, 0)
+            ).scalar_subquery()
+        }))
+
+def reconcile_unread_counts():
+    """Correct drift in the unread counters against the messages table.
+    
+    Recounts every conversation, then overwrites (and pushes) any cached
+    per-user total that disagrees. Returns the number of totals corrected.
+    The cached totals are only reachable from here with the shared Redis
+    store; in-process counters are corrected by their own expiry instead.
+    """
+    started_at = datetime.utcnow()
+    _recount_unread(db.session.connection())
+    db.session.commit()
+    
+    totals = {}
+    for user, unread in (
+        (Conversation.user_low_id, Conversation.unread_low),
+        (Conversation.user_high_id, Conversation.unread_high),
+    ):
+        query = db.session.query(user, db.func.sum(unread)).group_by(user)
+        if user is Conversation.user_high_id:
+            # A conversation with oneself is counted on the low side only
+            query = query.filter(Conversation.user_high_id != Conversation.user_low_id)
+        for user_id, count in query:
+            totals[user_id] = totals.get(user_id, 0) + int(count or 0)
+    
+    corrected = 0
+    for user_id, cached in unread_counters.snapshot().items():
+        if cached != totals.get(user_id, 0):
+            unread_counters.set(user_id, totals.get(user_id, 0))
+            corrected += 1
+    
+    BatchRun.record(UNREAD_RECONCILE_JOB, started_at, processed=corrected)
+    return corrected
+
+def rebuild_conversations(batch_size=500):
+    """Recompute every conversation summary from the messages table.
+    
+    Summaries are upserted in place so existing conversation ids and read
+    watermarks stay valid. Messages without a conversation_id (rows written
+    before the column existed) are assigned one, missing watermarks are
+    seeded from the legacy is_read flags, and unread counts are recounted
+    against the watermarks.
+    """
+    low = case((Message.sender_id < Message.recipient_id, Message.sender_id), else_=Message.recipient_id)
+    high = case((Message.sender_id < Message.recipient_id, Message.recipient_id), else_=Message.sender_id)
+    pairs = db.session.query(low, high, db.func.max(Message.id)).group_by(low, high).all()
+    
+    table = Conversation.__table__
+    message = Message.__table__
+    connection = db.session.connection()
+    now = datetime.utcnow()
+    summary = ('last_message_id', 'last_sender_id', 'last_message_preview', 'last_message_at')
+    for start in range(0, len(pairs), batch_size):
+        chunk = pairs[start:start + batch_size]
+        latest = {
+            row.id: row for row in connection.execute(
+                select(Message.id, Message.sender_id, Message.content, Message.created_at)
+                .where(Message.id.in_([pair[2] for pair in chunk]))
+            )
+        }
+        upsert(
+            connection, table,
+            [
+                {
+                    'user_low_id': pair_low,
+                    'user_high_id': pair_high,
+                    'last_message_id': last_id,
+                    'last_sender_id': latest[last_id].sender_id,
+                    'last_message_preview': (latest[last_id].content or '')[:PREVIEW_LENGTH],
+                    'last_message_at': latest[last_id].created_at or now,
+                    'read_low_id': None,
+                    'read_high_id': None,
+                    'unread_low': 0,
+                    'unread_high': 0,
+                    'created_at': now
+                }
+                for pair_low, pair_high, last_id in chunk
+            ],
+            index_elements=['user_low_id', 'user_high_id'],
+            update={name: (lambda excluded, name=name: excluded[name]) for name in summary}
+        )
+    
+    # Correlated subqueries; portable across SQLite and Postgres
+    connection.execute(
+        update(message)
+        .where(message.c.conversation_id == None)
+        .values(conversation_id=select(table.c.id).where(
+            table.c.user_low_id == case((message.c.sender_id < message.c.recipient_id, message.c.sender_id), else_=message.c.recipient_id),
+            table.c.user_high_id == case((message.c.sender_id < message.c.recipient_id, message.c.recipient_id), else_=message.c.sender_id)
+        ).scalar_subquery())
+    )
+    
+    for user, read in ((table.c.user_low_id, table.c.read_low_id), (table.c.user_high_id, table.c.read_high_id)):
+        connection.execute(update(table).where(read == None).values({
+            read: db.func.coalesce(select(db.func.max(message.c.id)).where(
+                message.c.conversation_id == table.c.id,
+                message.c.recipient_id == user,
+                message.c.is_read == True
+            ).scalar_subquery(), 0)
+        }))
+    _recount_unread(connection)
+    
+    db.session.commit()
+    return len(pairs)
+
 class ForumPost(db.Model):
+    __table_args__ = (
+        # Keyset walks of the feed, overall and per category
+        db.Index('ix_forum_post_created', 'created_at', 'id'),
+        db.Index('ix_forum_post_category_created', 'category', 'created_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(200), nullable=False)
@@ -54,3 +380,71 @@ class ForumPost(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+
+class ForumLike(db.Model):
+    """One user's like of a forum post; the unique pair makes liking idempotent"""
+    __tablename__ = 'forum_likes'
+    __table_args__ = (
+        db.UniqueConstraint('post_id', 'user_id', name='uq_forum_likes_post_user'),
+        db.Index('ix_forum_likes_user_post', 'user_id', 'post_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('forum_post.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ForumLike {self.user_id} -> {self.post_id}>'
+
+def _likes_count(connection, post_id):
+    table = ForumPost.__table__
+    return connection.execute(select(table.c.likes_count).where(table.c.id == post_id)).scalar() or 0
+
+def _adjust_likes(connection, post_id, delta):
+    """Atomically add ``delta`` to a post's likes_count, floored at zero; returns the new count.
+
+    The increment happens in SQL, so concurrent likes never overwrite each
+    other, and the post row is only locked for the rest of the short
+    like/unlike transaction. updated_at is left alone: a like is not an edit.
+    """
+    table = ForumPost.__table__
+    count = db.func.coalesce(table.c.likes_count, 0) + delta
+    connection.execute(
+        update(table).where(table.c.id == post_id).values(
+            likes_count=case((count < 0, 0), else_=count),
+            updated_at=table.c.updated_at
+        )
+    )
+    return _likes_count(connection, post_id)
+
+def like_post(post_id, user_id):
+    """Record a like; returns ``(changed, likes_count)``. Liking twice is a no-op. The caller commits."""
+    connection = db.session.connection()
+    inserted = upsert(
+        connection, ForumLike.__table__,
+        [{'post_id': post_id, 'user_id': user_id, 'created_at': datetime.utcnow()}],
+        index_elements=['post_id', 'user_id']
+    ).rowcount
+    if not inserted:
+        return False, _likes_count(connection, post_id)
+    return True, _adjust_likes(connection, post_id, 1)
+
+def unlike_post(post_id, user_id):
+    """Remove a like; returns ``(changed, likes_count)``. The caller commits."""
+    connection = db.session.connection()
+    table = ForumLike.__table__
+    deleted = connection.execute(
+        table.delete().where(table.c.post_id == post_id, table.c.user_id == user_id)
+    ).rowcount
+    if not deleted:
+        return False, _likes_count(connection, post_id)
+    return True, _adjust_likes(connection, post_id, -1)
+
+def liked_post_ids(user_id, post_ids):
+    """The subset of ``post_ids`` the user has liked, in one IN query"""
+    if not user_id or not post_ids:
+        return set()
+    return set(db.session.scalars(
+        select(ForumLike.post_id).where(ForumLike.user_id == user_id, ForumLike.post_id.in_(post_ids))
+    ))
@@ -0,0 +1,229 @@
+import json
+import zlib
+from datetime import datetime, timedelta
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, select
+from src.models.user import db
+from src.models.batch_run import BatchRun
+from src.models.message import Message, Conversation
+from src.utils.fulltext import clear_archived_message_search_index, index_archived_messages
+
+# zstd is optional; without it segments are zlib-compressed
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+JOB_NAME = 'message_archive'
+SEGMENT_SIZE = 500  # Messages per compressed segment
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+ARCHIVED_FIELDS = (
+    'id', 'conversation_id', 'sender_id', 'recipient_id', 'subject',
+    'content', 'is_read', 'message_type', 'created_at'
+)
+
+class MessageArchiveSegment(db.Model):
+    """A compressed run of old messages from one conversation.
+
+    Segments hold the oldest history of a conversation: every archived
+    message sorts before every message still in the hot table, so history
+    reads continue into the archive once the hot rows run out.
+    """
+    __tablename__ = 'message_archive_segments'
+    __table_args__ = (
+        db.Index('ix_message_archive_conversation_last', 'conversation_id', 'last_created_at', 'last_message_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversations.id'), nullable=False)
+    first_message_id = db.Column(db.Integer, nullable=False)
+    last_message_id = db.Column(db.Integer, nullable=False)
+    first_created_at = db.Column(db.DateTime, nullable=False)
+    last_created_at = db.Column(db.DateTime, nullable=False)
+    message_count = db.Column(db.Integer, nullable=False)
+    codec = db.Column(db.String(10), nullable=False)  # zstd, zlib
+    payload = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MessageArchiveSegment {self.conversation_id} {self.first_message_id}-{self.last_message_id}>'
+
+    def messages(self):
+        """Archived messages as transient Message objects, oldest first"""
+        rows = json.loads(_decompress(self.codec, self.payload))
+        for row in rows:
+            row['created_at'] = datetime.fromisoformat(row['created_at']) if row['created_at'] else None
+        return [Message(**row) for row in rows]
+
+class ArchivedMessage(db.Model):
+    """Where an archived message lives and who may see it.
+
+    One small row per archived message, so search can still find and
+    authorize old messages: the full-text index over their text (see
+    utils.fulltext) is keyed by the same message id.
+    """
+    __tablename__ = 'message_archive_entries'
+    __table_args__ = (
+        db.Index('ix_message_archive_entries_sender', 'sender_id', 'message_id'),
+        db.Index('ix_message_archive_entries_recipient', 'recipient_id', 'message_id'),
+    )
+
+    message_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    segment_id = db.Column(db.Integer, db.ForeignKey('message_archive_segments.id'), nullable=False, index=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversations.id'), nullable=False)
+    sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    recipient_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    def __repr__(self):
+        return f'<ArchivedMessage {self.message_id} in segment {self.segment_id}>'
+
+def _compress(raw):
+    if ZSTD_AVAILABLE:
+        return 'zstd', zstandard.ZstdCompressor(level=10).compress(raw)
+    return 'zlib', zlib.compress(raw, 9)
+
+def _decompress(codec, payload):
+    if codec == 'zstd':
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError('zstandard is required to read zstd message archive segments')
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return zlib.decompress(payload)
+
+def _serialize(message):
+    row = {name: getattr(message, name) for name in ARCHIVED_FIELDS}
+    row['created_at'] = message.created_at.isoformat() if message.created_at else None
+    return row
+
+def _entries(segment, messages):
+    return [{
+        'message_id': message.id,
+        'segment_id': segment.id,
+        'conversation_id': segment.conversation_id,
+        'sender_id': message.sender_id,
+        'recipient_id': message.recipient_id
+    } for message in messages]
+
+def _archive_conversation(conversation, cutoff):
+    """Move this conversation's archivable prefix into segments; returns messages moved.
+
+    Only messages read by their recipient are archived (so unread counts,
+    which are counted from the hot table, stay exact), and only as an
+    unbroken oldest-first run, so the archive never interleaves with hot rows.
+    """
+    moved = 0
+    while True:
+        batch = Message.query.filter(
+            Message.conversation_id == conversation.id,
+            Message.created_at < cutoff
+        ).order_by(Message.created_at, Message.id).limit(SEGMENT_SIZE).all()
+
+        run = []
+        for message in batch:
+            if message.id > conversation.read_up_to(message.recipient_id):
+                break
+            run.append(message)
+        if not run:
+            return moved
+
+        raw = json.dumps([_serialize(message) for message in run], separators=(',', ':'))
+        codec, payload = _compress(raw.encode('utf-8'))
+        segment = MessageArchiveSegment(
+            conversation_id=conversation.id,
+            first_message_id=run[0].id,
+            last_message_id=run[-1].id,
+            first_created_at=run[0].created_at,
+            last_created_at=run[-1].created_at,
+            message_count=len(run),
+            codec=codec,
+            payload=payload
+        )
+        db.session.add(segment)
+        db.session.flush()
+        
+        # Archived messages stay searchable through their own index
+        connection = db.session.connection()
+        connection.execute(ArchivedMessage.__table__.insert(), _entries(segment, run))
+        index_archived_messages(connection, run)
+        for message in batch:
+            db.session.expunge(message)
+        db.session.execute(delete(Message.__table__).where(Message.__table__.c.id.in_([message.id for message in run])))
+        db.session.commit()
+        moved += len(run)
+
+        if len(run) < len(batch) or len(batch) < SEGMENT_SIZE:
+            return moved
+
+def archive_old_messages(older_than_days=DEFAULT_ARCHIVE_AFTER_DAYS):
+    """Move messages older than ``older_than_days`` into compressed segments.
+
+    One commit per segment, so the job can be interrupted and rerun. Archived
+    messages leave the hot table and its indexes; search keeps finding them
+    through message_archive_entries and the archive search index.
+    Returns the number of messages archived.
+    """
+    started_at = datetime.utcnow()
+    cutoff = started_at - timedelta(days=older_than_days)
+
+    conversation_ids = db.session.scalars(
+        select(Message.conversation_id).where(Message.created_at < cutoff).distinct()
+    ).all()
+
+    moved = 0
+    for conversation_id in conversation_ids:
+        conversation = Conversation.query.get(conversation_id) if conversation_id is not None else None
+        if conversation is not None:
+            moved += _archive_conversation(conversation, cutoff)
+
+    BatchRun.record(JOB_NAME, started_at, processed=moved)
+    return moved
+
+def archived_messages(conversation_id, before=None, limit=20):
+    """Archived messages of a conversation, newest first.
+
+    ``before`` is an exclusive (created_at, id) upper bound, as in the history
+    keyset. Returns ``(messages, has_more)``.
+    """
+    query = MessageArchiveSegment.query.filter_by(conversation_id=conversation_id)
+    if before is not None:
+        query = query.filter(MessageArchiveSegment.first_created_at <= before[0])
+    segments = query.order_by(
+        MessageArchiveSegment.last_created_at.desc(), MessageArchiveSegment.last_message_id.desc()
+    )
+
+    messages = []
+    for segment in segments.yield_per(4):
+        for message in reversed(segment.messages()):
+            if before is None or (message.created_at, message.id) < tuple(before):
+                messages.append(message)
+        if len(messages) > limit:
+            break
+    return messages[:limit], len(messages) > limit
+
+def archived_messages_by_id(message_ids):
+    """{message_id: transient Message} for archived messages, decompressing each segment once"""
+    segment_ids = db.session.scalars(
+        select(ArchivedMessage.segment_id).where(ArchivedMessage.message_id.in_(list(message_ids))).distinct()
+    ).all() if message_ids else []
+    wanted = set(message_ids)
+    found = {}
+    for segment in MessageArchiveSegment.query.filter(MessageArchiveSegment.id.in_(segment_ids)):
+        for message in segment.messages():
+            if message.id in wanted:
+                found[message.id] = message
+    return found
+
+def reindex_archived_messages():
+    """Rebuild archive entries and their search index from the segments; returns messages indexed"""
+    connection = db.session.connection()
+    clear_archived_message_search_index(connection)
+    connection.execute(delete(ArchivedMessage.__table__))
+    indexed = 0
+    for segment in MessageArchiveSegment.query.order_by(MessageArchiveSegment.id).yield_per(16):
+        messages = segment.messages()
+        if messages:
+            connection.execute(ArchivedMessage.__table__.insert(), _entries(segment, messages))
+            index_archived_messages(connection, messages)
+        indexed += len(messages)
+    db.session.commit()
+    return indexed
@@ -0,0 +1,105 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from sqlalchemy import event, inspect, select, delete
+from src.models.user import db
+from src.models.alumni import Alumni, skill_names
+from src.utils.upsert import upsert
+
+def normalize_skill(name):
+    """Canonical dictionary key for a skill name ("  Machine  Learning" -> "machine learning")"""
+    return ' '.join(name.lower().split())
+
+class Skill(db.Model):
+    """Normalized skills dictionary shared by every profile"""
+    __tablename__ = 'skills'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    slug = db.Column(db.String(100), nullable=False, unique=True, index=True)  # normalize_skill(name)
+    name = db.Column(db.String(100), nullable=False)  # Display form as first entered
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Skill {self.slug}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'slug': self.slug,
+            'name': self.name
+        }
+
+class AlumniSkill(db.Model):
+    """Alumni <-> skill index, derived from Alumni.skills on every write"""
+    __tablename__ = 'alumni_skills'
+    __table_args__ = (
+        # "alumni with skill X" lookups start from the skill
+        db.Index('ix_alumni_skills_skill_id_alumni_id', 'skill_id', 'alumni_id'),
+    )
+    
+    alumni_id = db.Column(db.Integer, db.ForeignKey('alumni.id', ondelete='CASCADE'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True)
+    
+    def __repr__(self):
+        return f'<AlumniSkill {self.alumni_id} -> {self.skill_id}>'
+
+def skill_ids_for(connection, names, create=False):
+    """Map skill names to dictionary ids ({slug: id}), optionally adding new ones"""
+    by_slug = {}
+    for name in names:
+        slug = normalize_skill(name)[:100]
+        if slug:
+            by_slug.setdefault(slug, name.strip()[:100])
+    if not by_slug:
+        return {}
+    
+    table = Skill.__table__
+    if create:
+        upsert(
+            connection, table,
+            [{'slug': slug, 'name': name, 'created_at': datetime.utcnow()} for slug, name in by_slug.items()],
+            index_elements=['slug']
+        )
+    rows = connection.execute(select(table.c.slug, table.c.id).where(table.c.slug.in_(list(by_slug))))
+    return {slug: skill_id for slug, skill_id in rows}
+
+def sync_alumni_skills(connection, alumni_id, skills):
+    """Replace the indexed skills of one alumni with those in its JSON column"""
+    table = AlumniSkill.__table__
+    connection.execute(delete(table).where(table.c.alumni_id == alumni_id))
+    skill_ids = skill_ids_for(connection, skill_names(skills), create=True)
+    if skill_ids:
+        connection.execute(table.insert(), [
+            {'alumni_id': alumni_id, 'skill_id': skill_id} for skill_id in skill_ids.values()
+        ])
+
+@event.listens_for(Alumni, 'after_insert')
+def _index_new_alumni_skills(mapper, connection, target):
+    sync_alumni_skills(connection, target.id, target.skills)
+
+@event.listens_for(Alumni, 'after_update')
+def _reindex_changed_alumni_skills(mapper, connection, target):
+    if inspect(target).attrs.skills.history.has_changes():
+        sync_alumni_skills(connection, target.id, target.skills)
+
+@event.listens_for(Alumni, 'before_delete')
+def _unindex_deleted_alumni_skills(mapper, connection, target):
+    table = AlumniSkill.__table__
+    connection.execute(delete(table).where(table.c.alumni_id == target.id))
+
+def rebuild_skill_index(batch_size=500):
+    """Backfill the skill index from every alumni's JSON skills, one batch per commit"""
+    last_id = 0
+    indexed = 0
+    while True:
+        connection = db.session.connection()
+        rows = connection.execute(
+            select(Alumni.id, Alumni.skills).where(Alumni.id > last_id).order_by(Alumni.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for alumni_id, skills in rows:
+            sync_alumni_skills(connection, alumni_id, skills)
+        indexed += len(rows)
+        last_id = rows[-1][0]
+        db.session.commit()
+    return indexed
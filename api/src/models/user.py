@@ -169,6 +169,17 @@ class User(db.Model):
         
         return False
     
+    def to_card_dict(self):
+        """Compact author/sender card for feeds; the full record comes from to_dict()"""
+        return {
+            'id': self.id,
+            'username': self.username,
+            'institution_id': self.institution_id,
+            'role': self.role.value if self.role else None,
+            'full_name': self.get_full_name(),
+            'profile_image': self.profile_image
+        }
+    
     def to_dict(self, include_sensitive=False):
         data = {
             'id': self.id,
@@ -1,18 +1,202 @@
-from flask import Blueprint, jsonify, request, session
-from src.models.alumni import Alumni, db
-from src.models.user import User
+import csv
+import io
+import json
+from datetime import datetime
+import click
+from flask import Blueprint, Response, current_app, jsonify, request, session, stream_with_context
+from src.models.alumni import Alumni, db, recompute_alumni_scores, normalize_alumni_locations
+from src.models.user import User, UserRole
+from src.models.alumni_stats import AlumniStat, rebuild_alumni_stats
+from src.models.skill import Skill, AlumniSkill, normalize_skill, skill_ids_for, rebuild_skill_index
+from src.models.alumni_recommendation import AlumniRecommendation
+from src.models.batch_run import BatchRun
+from src.utils.auth_decorators import require_role
+from src.utils.cache import response_cache, cached_response
+from src.utils.http_cache import make_etag, latest, not_modified, with_validators
+from src.utils.pagination import get_page_size, keyset_paginate, InvalidCursor
+from src.utils.fulltext import alumni_search_ranking, rebuild_alumni_search_index
+from src.utils.trigram import fuzzy_name_search
+from src.utils.bulk_update import apply_alumni_updates, validate_alumni_changes
+from src.utils.geo import geohash_prefix_end, bounding_box, covering_cells, haversine_km, resolve_location
+from src.utils.recommendations import (
+    refresh_alumni_recommendations,
+    JOB_NAME as RECOMMENDATIONS_JOB, RECOMMENDATIONS_PER_ALUMNI
+)
 
 alumni_bp = Blueprint('alumni', __name__)
 
+# Directory listings and searches, dropped whenever an alumni row is written
+directory_cache = response_cache('alumni_directory', [Alumni])
+
+# Directory sort orders; each ends with the primary key so the order is total
+SORT_KEYS = {
+    'name': [(Alumni.last_name, False), (Alumni.id, False)],
+    'recent': [(Alumni.created_at, True), (Alumni.id, True)],
+    'networking_score': [(Alumni.networking_score, True), (Alumni.id, True)],
+    'profile_completeness': [(Alumni.profile_completeness, True), (Alumni.id, True)],
+}
+
+# Facets returned next to directory results, and the most buckets per facet
+FACETS = {
+    'department': Alumni.department,
+    'graduation_year': Alumni.graduation_year,
+    'location': Alumni.location_place,
+    'industry': Alumni.industry,
+}
+FACET_BUCKET_LIMIT = 50
+
+# Radius search defaults; a location filter that names a known place matches
+# everything within DEFAULT_RADIUS_KM of it
+DEFAULT_RADIUS_KM = 50
+MAX_RADIUS_KM = 500
+MAX_MAP_CLUSTERS = 1000
+
+# Rows fetched per server-side cursor round trip, and per streamed chunk
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+# Bulk updates: explicit items per request, and filters a set-clause may use
+MAX_BULK_ITEMS = 1000
+BULK_FILTER_FIELDS = ('ids', 'department', 'graduation_year', 'current_company', 'institution_id')
+
+def _within_radius(latitude, longitude, radius_km):
+    """Index-friendly superset of the circle: geohash prefix ranges plus a bounding box"""
+    cells = []
+    for cell in covering_cells(latitude, longitude, radius_km):
+        end = geohash_prefix_end(cell)
+        cells.append(db.and_(Alumni.geohash >= cell, Alumni.geohash < end) if end else Alumni.geohash >= cell)
+    south, west, north, east = bounding_box(latitude, longitude, radius_km)
+    clauses = [db.or_(*cells), Alumni.latitude.between(south, north)]
+    if west >= -180 and east <= 180:
+        clauses.append(Alumni.longitude.between(west, east))
+    return db.and_(*clauses)
+
+def _location_filter(location):
+    place = resolve_location(location)
+    if place is None:
+        return Alumni.location.ilike(f'%{location}%')
+    return _within_radius(place.latitude, place.longitude, DEFAULT_RADIUS_KM)
+
+def _search_filter(search):
+    return (
+        Alumni.first_name.ilike(f'%{search}%') |
+        Alumni.last_name.ilike(f'%{search}%') |
+        Alumni.current_company.ilike(f'%{search}%') |
+        Alumni.current_position.ilike(f'%{search}%') |
+        Alumni.skills.ilike(f'%{search}%')
+    )
+
+def _skill_filter(names):
+    """Alumni having every one of the named skills, via the skill index"""
+    wanted = {normalize_skill(name) for name in names if name and name.strip()}
+    skill_ids = skill_ids_for(db.session.connection(), wanted)
+    if len(skill_ids) < len(wanted):
+        # A skill nobody has listed can't be matched
+        return db.false()
+    
+    matching = db.select(AlumniSkill.alumni_id).where(
+        AlumniSkill.skill_id.in_(list(skill_ids.values()))
+    ).group_by(AlumniSkill.alumni_id).having(db.func.count(AlumniSkill.skill_id) == len(skill_ids))
+    return Alumni.id.in_(matching)
+
+def _apply_search(query, search, sort):
+    """Restrict a directory query to alumni matching ``search``.
+
+    Uses the full-text index when the database has one and falls back to
+    ILIKE otherwise. Returns the query and the rank column to order by when
+    the caller asked for relevance ordering.
+    """
+    ranking = alumni_search_ranking(search)
+    if ranking is None:
+        return query.filter(_search_filter(search)), None
+    
+    query = query.join(ranking, ranking.c.alumni_id == Alumni.id)
+    if sort != 'relevance':
+        return query, None
+    return query.add_columns(ranking.c.rank), ranking.c.rank
+
+def _facet_counts(query):
+    """Count every facet bucket over the filtered directory in one grouped scan.
+
+    Postgres computes all facets with GROUPING SETS; elsewhere we group by the
+    combination of facet columns and fold the (much smaller) result per facet.
+    """
+    names = list(FACETS)
+    columns = list(FACETS.values())
+    counts = {name: {} for name in names}
+    
+    if db.engine.dialect.name == 'postgresql':
+        flags = [db.func.grouping(column) for column in columns]
+        rows = query.with_entities(*columns, *flags, db.func.count(Alumni.id)).group_by(
+            db.func.grouping_sets(*columns)
+        ).all()
+        for row in rows:
+            values, grouped, count = row[:len(names)], row[len(names):-1], row[-1]
+            for name, value, flag in zip(names, values, grouped):
+                if flag == 0:
+                    counts[name][value] = count
+    else:
+        rows = query.with_entities(*columns, db.func.count(Alumni.id)).group_by(*columns).all()
+        for row in rows:
+            for name, value in zip(names, row[:-1]):
+                counts[name][value] = counts[name].get(value, 0) + row[-1]
+    
+    facets = {}
+    for name in names:
+        buckets = [(value, count) for value, count in counts[name].items() if value not in (None, '')]
+        buckets.sort(key=lambda bucket: (-bucket[1], str(bucket[0])))
+        facets[name] = [{'value': value, 'count': count} for value, count in buckets[:FACET_BUCKET_LIMIT]]
+    return facets
+
+def _paginated_response(query, sort, cursor, per_page, rank=None, facets=False):
+    """Run a directory query one keyset page at a time"""
+    per_page = get_page_size(per_page, max_setting='ALUMNI_MAX_PAGE_SIZE')
+    
+    if rank is not None:
+        # Rows are (Alumni, rank) pairs, best match first
+        sort_keys = [(rank, False), (Alumni.id, False)]
+        row_key = lambda row: [row.rank, row.Alumni.id]
+    else:
+        sort_keys = SORT_KEYS.get(sort, SORT_KEYS['name'])
+        row_key = None
+    
+    try:
+        rows, next_cursor = keyset_paginate(
+            query, sort_keys, cursor=cursor, limit=per_page, row_key=row_key
+        )
+    except InvalidCursor:
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    
+    alumni = [row.Alumni for row in rows] if rank is not None else rows
+    viewer_role = session.get('user_role')
+    
+    response = {
+        'success': True,
+        'alumni': [alum.to_card_dict(viewer_role=viewer_role) for alum in alumni],
+        'pagination': {
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+    }
+    
+    if facets:
+        response['facets'] = _facet_counts(query)
+    
+    return jsonify(response), 200
+
 @alumni_bp.route('/alumni', methods=['GET'])
+@cached_response(directory_cache)
 def get_alumni():
     # Get query parameters for filtering
     department = request.args.get('department')
     graduation_year = request.args.get('graduation_year')
     location = request.args.get('location')
     search = request.args.get('search')
+    sort = request.args.get('sort') or ('relevance' if search else 'name')
+    rank = None
     
-    query = Alumni.query.join(User)
+    query = Alumni.query.join(User).options(Alumni.card_query_options())
     
     # Apply filters
     if department and department != 'all':
@@ -22,38 +206,310 @@ def get_alumni():
         query = query.filter(Alumni.graduation_year == int(graduation_year))
     
     if location and location != 'all':
-        query = query.filter(Alumni.location.ilike(f'%{location}%'))
+        query = query.filter(_location_filter(location))
+    
+    skills = request.args.getlist('skill')
+    if skills:
+        query = query.filter(_skill_filter(skills))
+    
+    min_networking_score = request.args.get('min_networking_score', type=int)
+    if min_networking_score is not None:
+        query = query.filter(Alumni.networking_score >= min_networking_score)
+    
+    min_completeness = request.args.get('min_completeness', type=int)
+    if min_completeness is not None:
+        query = query.filter(Alumni.profile_completeness >= min_completeness)
     
     if search:
-        search_filter = (
-            Alumni.first_name.ilike(f'%{search}%') |
-            Alumni.last_name.ilike(f'%{search}%') |
-            Alumni.current_company.ilike(f'%{search}%') |
-            Alumni.current_position.ilike(f'%{search}%') |
-            Alumni.skills.ilike(f'%{search}%')
+        query, rank = _apply_search(query, search, sort)
+    
+    return _paginated_response(
+        query,
+        sort=sort,
+        cursor=request.args.get('cursor'),
+        per_page=request.args.get('per_page'),
+        rank=rank,
+        facets=request.args.get('facets', 'false').lower() == 'true'
+    )
+
+@alumni_bp.route('/alumni/name-search', methods=['GET'])
+def name_search():
+    # Typo-tolerant name lookup for search-as-you-type
+    query = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 10, type=int), 25)
+    if len(query) < 2:
+        return jsonify({'success': True, 'alumni': []}), 200
+    
+    budget_ms = current_app.config.get('NAME_SEARCH_BUDGET_MS', 50)
+    matches = fuzzy_name_search(query, limit=limit, budget_ms=budget_ms)
+    
+    alumni = {
+        alum.id: alum for alum in Alumni.query.options(Alumni.card_query_options()).filter(
+            Alumni.id.in_([alumni_id for alumni_id, _ in matches])
+        )
+    }
+    
+    viewer_role = session.get('user_role')
+    results = []
+    for alumni_id, similarity in matches:
+        if alumni_id in alumni:
+            card = alumni[alumni_id].to_card_dict(viewer_role=viewer_role)
+            card['similarity'] = round(similarity, 3)
+            results.append(card)
+    
+    return jsonify({
+        'success': True,
+        'alumni': results
+    }), 200
+
+@alumni_bp.route('/alumni/nearby', methods=['GET'])
+def get_nearby_alumni():
+    # Centre is either ?lat=&lon= or a place name in ?near=
+    latitude = request.args.get('lat', type=float)
+    longitude = request.args.get('lon', type=float)
+    near = request.args.get('near')
+    if latitude is None or longitude is None:
+        place = resolve_location(near) if near else None
+        if place is None:
+            return jsonify({
+                'success': False,
+                'message': 'Provide lat and lon, or a recognized place in near'
+            }), 400
+        latitude, longitude = place.latitude, place.longitude
+    elif not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return jsonify({'success': False, 'message': 'Coordinates out of range'}), 400
+    
+    radius_km = request.args.get('radius_km', DEFAULT_RADIUS_KM, type=float)
+    radius_km = max(0.1, min(radius_km, MAX_RADIUS_KM))
+    limit = get_page_size(request.args.get('limit'), max_setting='ALUMNI_MAX_PAGE_SIZE')
+    
+    candidates = db.session.query(Alumni.id, Alumni.latitude, Alumni.longitude).join(User).filter(
+        _within_radius(latitude, longitude, radius_km)
+    ).all()
+    
+    distances = []
+    for alumni_id, lat, lon in candidates:
+        distance = haversine_km(latitude, longitude, lat, lon)
+        if distance <= radius_km:
+            distances.append((distance, alumni_id))
+    distances.sort()
+    nearest = distances[:limit]
+    
+    alumni = {
+        alum.id: alum for alum in Alumni.query.options(Alumni.card_query_options()).filter(
+            Alumni.id.in_([alumni_id for _, alumni_id in nearest])
+        )
+    }
+    
+    viewer_role = session.get('user_role')
+    results = []
+    for distance, alumni_id in nearest:
+        card = alumni[alumni_id].to_card_dict(viewer_role=viewer_role)
+        card['distance_km'] = round(distance, 1)
+        results.append(card)
+    
+    return jsonify({
+        'success': True,
+        'center': {'latitude': latitude, 'longitude': longitude},
+        'radius_km': radius_km,
+        'total': len(distances),
+        'alumni': results
+    }), 200
+
+@alumni_bp.route('/alumni/map-clusters', methods=['GET'])
+def get_alumni_map_clusters():
+    # One marker per geohash cell; precision follows the map zoom
+    # (1 ~ continent, 3 ~ region, 5 ~ city district)
+    precision = max(1, min(request.args.get('precision', 3, type=int), 6))
+    cell = db.func.substr(Alumni.geohash, 1, precision)
+    count = db.func.count(Alumni.id)
+    
+    query = db.session.query(
+        cell.label('cell'),
+        count.label('count'),
+        db.func.avg(Alumni.latitude),
+        db.func.avg(Alumni.longitude)
+    ).filter(Alumni.geohash.isnot(None))
+    
+    bounds = [request.args.get(name, type=float) for name in ('south', 'west', 'north', 'east')]
+    if all(value is not None for value in bounds):
+        south, west, north, east = bounds
+        query = query.filter(Alumni.latitude.between(south, north))
+        if west <= east:
+            query = query.filter(Alumni.longitude.between(west, east))
+        else:
+            # Viewport crosses the antimeridian
+            query = query.filter(db.or_(Alumni.longitude >= west, Alumni.longitude <= east))
+    
+    rows = query.group_by(cell).order_by(count.desc()).limit(MAX_MAP_CLUSTERS).all()
+    
+    return jsonify({
+        'success': True,
+        'precision': precision,
+        'clusters': [
+            {
+                'geohash': geohash,
+                'count': int(total),
+                'latitude': float(latitude),
+                'longitude': float(longitude)
+            }
+            for geohash, total, latitude, longitude in rows
+        ]
+    }), 200
+
+@alumni_bp.route('/alumni/recommendations', methods=['GET'])
+def get_recommendations():
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    
+    # Admins may look up any alumni of an institution they manage
+    alumni_id = request.args.get('alumni_id', type=int)
+    if alumni_id:
+        alumni = Alumni.query.get_or_404(alumni_id)
+        if alumni.user_id != user_id and not user.can_manage_institution(alumni.user.institution_id if alumni.user else None):
+            return jsonify({'success': False, 'message': 'Unauthorized'}), 403
+    else:
+        alumni = Alumni.query.filter_by(user_id=user_id).first()
+        if not alumni:
+            return jsonify({'success': False, 'message': 'Alumni profile not found'}), 404
+    
+    # Served from the stored lists only; the refresh job rescores changed
+    # profiles, so a read never rebuilds the institution's feature space
+    recommendations = AlumniRecommendation.query.filter_by(alumni_id=alumni.id).order_by(AlumniRecommendation.rank).all()
+    computed_at = recommendations[0].computed_at if recommendations else None
+    
+    limit = max(1, min(request.args.get('limit', 10, type=int), RECOMMENDATIONS_PER_ALUMNI))
+    recommendations = recommendations[:limit]
+    
+    # One IN query for every suggested card; deleted profiles are dropped
+    suggested = {
+        alum.id: alum for alum in Alumni.query.options(Alumni.card_query_options()).filter(
+            Alumni.id.in_([rec.recommended_id for rec in recommendations])
         )
-        query = query.filter(search_filter)
+    }
+    
+    viewer_role = session.get('user_role')
+    results = []
+    for rec in recommendations:
+        other = suggested.get(rec.recommended_id)
+        if other:
+            rec_data = rec.to_dict()
+            rec_data['alumni'] = other.to_card_dict(viewer_role=viewer_role)
+            results.append(rec_data)
     
-    alumni = query.all()
+    return jsonify({
+        'success': True,
+        'alumni_id': alumni.id,
+        'recommendations': results,
+        'computed_at': computed_at.isoformat() if computed_at else None
+    }), 200
+
+@alumni_bp.route('/alumni/recommendations/refresh', methods=['POST'])
+@require_role([UserRole.SUPER_ADMIN])
+def refresh_recommendations():
+    full = bool((request.json or {}).get('full')) if request.is_json else False
+    refreshed = refresh_alumni_recommendations(full=full)
     
     return jsonify({
         'success': True,
-        'alumni': [alum.to_dict() for alum in alumni],
-        'total': len(alumni)
+        'alumni_refreshed': refreshed,
+        'run': BatchRun.query.get(RECOMMENDATIONS_JOB).to_dict()
     }), 200
 
+def _csv_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, separators=(',', ':'))
+    return value
+
+def _export_lines(rows, export_format):
+    """Serialize dict rows one chunk at a time; the header comes from the first row"""
+    buffer = io.StringIO()
+    writer = None
+    for count, data in enumerate(rows, start=1):
+        if export_format == 'ndjson':
+            buffer.write(json.dumps(data, default=str))
+            buffer.write('\n')
+        else:
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(data), extrasaction='ignore')
+                writer.writeheader()
+            writer.writerow({key: _csv_value(value) for key, value in data.items()})
+        
+        if count % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@alumni_bp.route('/alumni/export', methods=['GET'])
+@require_role([UserRole.SUPER_ADMIN, UserRole.INSTITUTION_ADMIN])
+def export_alumni():
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'message': 'format must be csv or ndjson'}), 400
+    
+    user = User.query.get(session['user_id'])
+    institution_id = request.args.get('institution_id', type=int)
+    if not user.is_super_admin():
+        institution_id = user.institution_id
+    
+    statement = db.select(Alumni).join(User, User.id == Alumni.user_id)
+    if institution_id is not None:
+        statement = statement.where(User.institution_id == institution_id)
+    
+    department = request.args.get('department')
+    if department and department != 'all':
+        statement = statement.where(Alumni.department == department)
+    
+    graduation_year = request.args.get('graduation_year', type=int)
+    if graduation_year:
+        statement = statement.where(Alumni.graduation_year == graduation_year)
+    
+    # yield_per streams from a server-side cursor where the driver supports
+    # it, so memory stays flat however many rows the institution has
+    statement = statement.order_by(Alumni.id).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    viewer_role = user.role.value
+    
+    def rows():
+        # Runs inside the streamed response, not the view
+        for alumni in db.session.scalars(statement):
+            yield alumni.to_dict(viewer_role=viewer_role)
+    
+    filename = f"alumni_export_{datetime.utcnow().strftime('%Y%m%d')}.{export_format}"
+    return Response(
+        stream_with_context(_export_lines(rows(), export_format)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}'
+        }
+    )
+
 @alumni_bp.route('/alumni/<int:alumni_id>', methods=['GET'])
 def get_alumni_profile(alumni_id):
     alumni = Alumni.query.get_or_404(alumni_id)
     user = User.query.get(alumni.user_id)
     
+    user_updated_at = user.updated_at if user else None
+    etag = make_etag('alumni', alumni.id, alumni.updated_at, user_updated_at)
+    last_modified = latest(alumni.updated_at, user_updated_at)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    
     profile_data = alumni.to_dict()
     profile_data['user'] = user.to_dict() if user else None
     
-    return jsonify({
+    return with_validators(jsonify({
         'success': True,
         'alumni': profile_data
-    }), 200
+    }), etag, last_modified), 200
 
 @alumni_bp.route('/alumni/<int:alumni_id>', methods=['PUT'])
 def update_alumni_profile(alumni_id):
@@ -90,50 +546,202 @@ def update_alumni_profile(alumni_id):
         'message': 'Profile updated successfully'
     }), 200
 
+def _bulk_scope(user, institution_id=None):
+    """Alumni ids an admin may write: everyone for super admins, else their institution"""
+    statement = db.select(Alumni.id).join(User, User.id == Alumni.user_id)
+    if not user.is_super_admin():
+        institution_id = user.institution_id
+    if institution_id is not None:
+        statement = statement.where(User.institution_id == institution_id)
+    return statement
+
+def _is_alumni_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _validate_bulk_filter(criteria):
+    if not isinstance(criteria, dict) or not criteria:
+        return ['filter must name at least one of ' + ', '.join(BULK_FILTER_FIELDS)]
+    errors = [f'{name} is not a supported filter' for name in criteria if name not in BULK_FILTER_FIELDS]
+    ids = criteria.get('ids')
+    if ids is not None and (not isinstance(ids, list) or not all(_is_alumni_id(alumni_id) for alumni_id in ids)):
+        errors.append('ids must be a list of integers')
+    for name in ('graduation_year', 'institution_id'):
+        value = criteria.get(name)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+            errors.append(f'{name} must be an integer')
+    return errors
+
+@alumni_bp.route('/alumni/bulk', methods=['PATCH'])
+@require_role([UserRole.SUPER_ADMIN, UserRole.INSTITUTION_ADMIN])
+def bulk_update_alumni():
+    """Apply many partial updates in one transaction.
+    
+    Body is either ``{"updates": [{"id": 1, "department": "..."}, ...]}`` or
+    ``{"filter": {...}, "set": {...}}``. Everything is validated before any
+    write; one invalid item rejects the whole batch.
+    """
+    data = request.get_json(silent=True) or {}
+    user = User.query.get(session['user_id'])
+    
+    if 'filter' in data or 'set' in data:
+        criteria = data.get('filter')
+        values = data.get('set')
+        errors = _validate_bulk_filter(criteria) + validate_alumni_changes(values)
+        if errors:
+            return jsonify({'success': False, 'message': 'Invalid bulk update', 'errors': errors}), 400
+        
+        statement = _bulk_scope(user, criteria.get('institution_id'))
+        if criteria.get('ids') is not None:
+            statement = statement.where(Alumni.id.in_(criteria['ids']))
+        for name in ('department', 'graduation_year', 'current_company'):
+            if criteria.get(name) is not None:
+                statement = statement.where(getattr(Alumni, name) == criteria[name])
+        
+        ids = db.session.scalars(statement).all()
+        updated = apply_alumni_updates({alumni_id: values for alumni_id in ids})
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'updated': updated,
+            'message': f'{updated} profiles updated'
+        }), 200
+    
+    items = data.get('updates')
+    if not isinstance(items, list) or not items:
+        return jsonify({'success': False, 'message': 'updates or filter and set are required'}), 400
+    if len(items) > MAX_BULK_ITEMS:
+        return jsonify({'success': False, 'message': f'At most {MAX_BULK_ITEMS} updates per request'}), 400
+    
+    requested = {item['id'] for item in items if isinstance(item, dict) and _is_alumni_id(item.get('id'))}
+    # One IN query checks every id exists and is within the admin's institution
+    writable = set(db.session.scalars(_bulk_scope(user).where(Alumni.id.in_(requested))))
+    
+    results = []
+    updates = {}
+    seen = set()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({'index': index, 'id': None, 'status': 'invalid', 'errors': ['Each update must be an object']})
+            continue
+        
+        alumni_id = item.get('id')
+        values = {name: value for name, value in item.items() if name != 'id'}
+        errors = validate_alumni_changes(values)
+        # Checked before any set lookup: a list or object id is unhashable
+        if not _is_alumni_id(alumni_id):
+            results.append({'index': index, 'id': alumni_id, 'status': 'invalid', 'errors': ['id must be an integer'] + errors})
+            continue
+        if alumni_id in seen:
+            errors.insert(0, 'Duplicate id in batch')
+        elif alumni_id not in writable:
+            errors.insert(0, 'Alumni not found')
+        seen.add(alumni_id)
+        
+        if errors:
+            results.append({'index': index, 'id': alumni_id, 'status': 'invalid', 'errors': errors})
+        else:
+            updates[alumni_id] = values
+            results.append({'index': index, 'id': alumni_id, 'status': 'updated'})
+    
+    if len(updates) < len(items):
+        for result in results:
+            if result['status'] == 'updated':
+                result['status'] = 'skipped'
+        return jsonify({
+            'success': False,
+            'message': 'No profiles were updated; fix the invalid items and resubmit',
+            'results': results
+        }), 400
+    
+    apply_alumni_updates(updates)
+    db.session.commit()
+    
+    return jsonify({
+        'success': True,
+        'updated': len(updates),
+        'results': results
+    }), 200
+
 @alumni_bp.route('/alumni/stats', methods=['GET'])
 def get_alumni_stats():
-    total_alumni = Alumni.query.count()
-    mentors_count = Alumni.query.filter_by(is_mentor=True).count()
+    # Served from the maintained rollup; without an institution we sum the
+    # (small) rollup across institutions
+    institution_id = request.args.get('institution_id', type=int)
     
-    # Get graduation year distribution
-    year_stats = db.session.query(
-        Alumni.graduation_year,
-        db.func.count(Alumni.id).label('count')
-    ).group_by(Alumni.graduation_year).all()
+    query = db.session.query(
+        AlumniStat.dimension,
+        AlumniStat.bucket,
+        db.func.sum(AlumniStat.count)
+    )
+    if institution_id is not None:
+        query = query.filter(AlumniStat.institution_id == institution_id)
+    rows = query.group_by(AlumniStat.dimension, AlumniStat.bucket).all()
     
-    # Get department distribution
-    dept_stats = db.session.query(
-        Alumni.department,
-        db.func.count(Alumni.id).label('count')
-    ).group_by(Alumni.department).all()
+    totals = {}
+    year_stats = []
+    dept_stats = []
+    for dimension, bucket, count in rows:
+        if not count:
+            continue
+        if dimension == 'graduation_year':
+            year_stats.append((int(bucket), int(count)))
+        elif dimension == 'department':
+            dept_stats.append((bucket, int(count)))
+        else:
+            totals[dimension] = int(count)
     
     return jsonify({
         'success': True,
         'stats': {
-            'total_alumni': total_alumni,
-            'mentors_count': mentors_count,
-            'graduation_years': [{'year': year, 'count': count} for year, count in year_stats],
-            'departments': [{'department': dept, 'count': count} for dept, count in dept_stats]
+            'total_alumni': totals.get('total', 0),
+            'mentors_count': totals.get('mentors', 0),
+            'graduation_years': [{'year': year, 'count': count} for year, count in sorted(year_stats)],
+            'departments': [{'department': dept, 'count': count} for dept, count in sorted(dept_stats)]
         }
     }), 200
 
+@alumni_bp.route('/alumni/cache-stats', methods=['GET'])
+@require_role([UserRole.SUPER_ADMIN])
+def get_cache_stats():
+    return jsonify({
+        'success': True,
+        'caches': {directory_cache.name: directory_cache.stats()}
+    }), 200
+
+@alumni_bp.route('/alumni/skills/top', methods=['GET'])
+def get_top_skills():
+    department = request.args.get('department')
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    
+    count = db.func.count(AlumniSkill.alumni_id)
+    query = db.session.query(Skill.name, Skill.slug, count.label('count')).join(
+        AlumniSkill, AlumniSkill.skill_id == Skill.id
+    )
+    if department and department != 'all':
+        query = query.join(Alumni, Alumni.id == AlumniSkill.alumni_id).filter(Alumni.department == department)
+    
+    rows = query.group_by(Skill.id, Skill.name, Skill.slug).order_by(count.desc(), Skill.slug).limit(limit).all()
+    
+    return jsonify({
+        'success': True,
+        'department': department,
+        'skills': [{'name': name, 'slug': slug, 'count': count} for name, slug, count in rows]
+    }), 200
+
 @alumni_bp.route('/alumni/search', methods=['POST'])
+@cached_response(directory_cache)
 def search_alumni():
     data = request.json
     search_term = data.get('search', '')
     filters = data.get('filters', {})
+    sort = data.get('sort') or ('relevance' if search_term else 'name')
+    rank = None
     
-    query = Alumni.query.join(User)
+    query = Alumni.query.join(User).options(Alumni.card_query_options())
     
     if search_term:
-        search_filter = (
-            Alumni.first_name.ilike(f'%{search_term}%') |
-            Alumni.last_name.ilike(f'%{search_term}%') |
-            Alumni.current_company.ilike(f'%{search_term}%') |
-            Alumni.current_position.ilike(f'%{search_term}%') |
-            Alumni.skills.ilike(f'%{search_term}%')
-        )
-        query = query.filter(search_filter)
+        query, rank = _apply_search(query, search_term, sort)
     
     # Apply additional filters
     if filters.get('department'):
@@ -148,11 +756,57 @@ def search_alumni():
     if filters.get('is_mentor') is not None:
         query = query.filter(Alumni.is_mentor == filters['is_mentor'])
     
-    alumni = query.all()
+    if filters.get('skills'):
+        query = query.filter(_skill_filter(filters['skills']))
     
-    return jsonify({
-        'success': True,
-        'alumni': [alum.to_dict() for alum in alumni],
-        'total': len(alumni)
-    }), 200
+    if filters.get('min_networking_score') is not None:
+        query = query.filter(Alumni.networking_score >= int(filters['min_networking_score']))
+    
+    if filters.get('min_completeness') is not None:
+        query = query.filter(Alumni.profile_completeness >= int(filters['min_completeness']))
+    
+    return _paginated_response(
+        query,
+        sort=sort,
+        cursor=data.get('cursor'),
+        per_page=data.get('per_page'),
+        rank=rank,
+        facets=bool(data.get('facets'))
+    )
+
+@alumni_bp.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Repopulate the alumni full-text search index"""
+    rebuild_alumni_search_index()
+    print("Alumni search index rebuilt")
+
+@alumni_bp.cli.command('recompute-scores')
+def recompute_scores_command():
+    """Recompute materialized profile scores for all alumni"""
+    changed = recompute_alumni_scores()
+    print(f"Recomputed alumni scores ({changed} changed)")
+
+@alumni_bp.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Recompute the alumni statistics rollup from scratch"""
+    buckets = rebuild_alumni_stats()
+    print(f"Alumni stats rollup rebuilt ({buckets} buckets)")
+
+@alumni_bp.cli.command('rebuild-skill-index')
+def rebuild_skill_index_command():
+    """Backfill the normalized skill index from alumni profiles"""
+    indexed = rebuild_skill_index()
+    print(f"Skill index rebuilt for {indexed} alumni")
+
+@alumni_bp.cli.command('normalize-locations')
+def normalize_locations_command():
+    """Re-resolve alumni locations against the bundled gazetteer"""
+    changed = normalize_alumni_locations()
+    print(f"Alumni locations normalized ({changed} changed)")
 
+@alumni_bp.cli.command('refresh-recommendations')
+@click.option('--full', is_flag=True, help='Rescore every alumni instead of only changed ones')
+def refresh_recommendations_command(full):
+    """Recompute stored "people you may know" suggestions"""
+    refreshed = refresh_alumni_recommendations(full=full)
+    print(f"Recommendations refreshed for {refreshed} alumni")
@@ -3,6 +3,7 @@ from datetime import datetime
 from src.models.donation import Donation, DonationCampaign, db
 from src.models.user import User
 from src.models.alumni import Alumni
+from src.utils.http_cache import make_etag, latest, not_modified, with_validators
 
 donations_bp = Blueprint('donations', __name__)
 
@@ -74,6 +75,20 @@ def create_campaign():
 def get_campaign(campaign_id):
     campaign = DonationCampaign.query.get_or_404(campaign_id)
     
+    # Completed-donation counters, also used as cache validators. Edits to
+    # donor profiles shown next to recent donations do not change the tag.
+    donor_count, last_id, last_donated_at = db.session.query(
+        db.func.count(Donation.id),
+        db.func.max(Donation.id),
+        db.func.max(Donation.donated_at)
+    ).filter(Donation.campaign_id == campaign_id, Donation.status == 'completed').one()
+    
+    etag = make_etag('campaign', campaign.id, campaign.updated_at, donor_count, last_id)
+    last_modified = latest(campaign.updated_at, last_donated_at)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    
     campaign_data = campaign.to_dict()
     
     # Get recent donations
@@ -96,19 +111,12 @@ def get_campaign(campaign_id):
         donations_data.append(donation_data)
     
     campaign_data['recent_donations'] = donations_data
-    
-    # Get donor count
-    donor_count = Donation.query.filter_by(
-        campaign_id=campaign_id,
-        status='completed'
-    ).count()
-    
     campaign_data['donor_count'] = donor_count
     
-    return jsonify({
+    return with_validators(jsonify({
         'success': True,
         'campaign': campaign_data
-    }), 200
+    }), etag, last_modified), 200
 
 @donations_bp.route('/donate', methods=['POST'])
 def make_donation():
@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request, session
 from datetime import datetime
 from src.models.event import Event, EventRegistration, db
 from src.models.user import User
+from src.utils.http_cache import make_etag, not_modified, with_validators
 
 events_bp = Blueprint('events', __name__)
 
@@ -77,33 +78,51 @@ def create_event():
 def get_event(event_id):
     event = Event.query.get_or_404(event_id)
     
-    # Get registration count
-    registration_count = EventRegistration.query.filter_by(
-        event_id=event.id, 
-        status='registered'
-    ).count()
+    # Registration counters, also used as cache validators
+    total, registration_count, last_id = db.session.query(
+        db.func.count(EventRegistration.id),
+        db.func.sum(db.case((EventRegistration.status == 'registered', 1), else_=0)),
+        db.func.max(EventRegistration.id)
+    ).filter(EventRegistration.event_id == event.id).one()
+    registration_count = int(registration_count or 0)
     
     # Get organizer info
     organizer = User.query.get(event.organizer_id)
     
-    event_data = event.to_dict()
-    event_data['registration_count'] = registration_count
-    event_data['organizer'] = organizer.to_dict() if organizer else None
-    
     # Check if current user is registered
     user_id = session.get('user_id')
+    registration = None
     if user_id:
         registration = EventRegistration.query.filter_by(
             event_id=event.id,
             user_id=user_id
         ).first()
+    
+    organizer_updated_at = organizer.updated_at if organizer else None
+    etag = make_etag(
+        'event', event.id, event.updated_at, organizer_updated_at,
+        total, registration_count, last_id,
+        user_id, registration.status if registration else None
+    )
+    # ETag only: cancelling or withdrawing a registration changes the counts
+    # and the viewer's status without bumping any timestamp, so a
+    # Last-Modified date could validate a stale body
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    event_data = event.to_dict()
+    event_data['registration_count'] = registration_count
+    event_data['organizer'] = organizer.to_dict() if organizer else None
+    
+    if user_id:
         event_data['user_registered'] = registration is not None
         event_data['registration_status'] = registration.status if registration else None
     
-    return jsonify({
+    return with_validators(jsonify({
         'success': True,
         'event': event_data
-    }), 200
+    }), etag), 200
 
 @events_bp.route('/events/<int:event_id>/register', methods=['POST'])
 def register_for_event(event_id):
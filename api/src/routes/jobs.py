@@ -3,6 +3,7 @@ from datetime import datetime
 from src.models.job import Job, JobApplication, db
 from src.models.user import User
 from src.models.alumni import Alumni
+from src.utils.http_cache import make_etag, latest, not_modified, with_validators
 
 jobs_bp = Blueprint('jobs', __name__)
 
@@ -110,33 +111,53 @@ def create_job():
 def get_job(job_id):
     job = Job.query.get_or_404(job_id)
     
-    job_data = job.to_dict()
-    
     # Get poster info
     poster = User.query.get(job.posted_by)
     alumni = Alumni.query.filter_by(user_id=job.posted_by).first()
     
-    job_data['posted_by_user'] = poster.to_dict() if poster else None
-    job_data['posted_by_alumni'] = alumni.to_dict() if alumni else None
-    
-    # Get application count
-    application_count = JobApplication.query.filter_by(job_id=job.id).count()
-    job_data['application_count'] = application_count
+    # Application counters, also used as cache validators
+    application_count, last_id, last_applied_at = db.session.query(
+        db.func.count(JobApplication.id),
+        db.func.max(JobApplication.id),
+        db.func.max(JobApplication.applied_at)
+    ).filter(JobApplication.job_id == job.id).one()
     
     # Check if current user has applied
     user_id = session.get('user_id')
+    user_application = None
     if user_id:
         user_application = JobApplication.query.filter_by(
             job_id=job.id,
             applicant_id=user_id
         ).first()
+    
+    poster_updated_at = poster.updated_at if poster else None
+    alumni_updated_at = alumni.updated_at if alumni else None
+    etag = make_etag(
+        'job', job.id, job.updated_at, poster_updated_at, alumni_updated_at,
+        application_count, last_id,
+        user_id, user_application.status if user_application else None
+    )
+    # The viewer's application status changes without a timestamp, so
+    # personalized responses are validated by ETag alone
+    last_modified = None if user_id else latest(job.updated_at, poster_updated_at, alumni_updated_at, last_applied_at)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    
+    job_data = job.to_dict()
+    job_data['posted_by_user'] = poster.to_dict() if poster else None
+    job_data['posted_by_alumni'] = alumni.to_dict() if alumni else None
+    job_data['application_count'] = application_count
+    
+    if user_id:
         job_data['user_applied'] = user_application is not None
         job_data['application_status'] = user_application.status if user_application else None
     
-    return jsonify({
+    return with_validators(jsonify({
         'success': True,
         'job': job_data
-    }), 200
+    }), etag, last_modified), 200
 
 @jobs_bp.route('/jobs/<int:job_id>/apply', methods=['POST'])
 def apply_for_job(job_id):
@@ -0,0 +1,80 @@
+import click
+from flask import Blueprint, jsonify, request, session
+from src.models.user import User, UserRole, db
+from src.models.alumni import Alumni
+from src.models.student import Student
+from src.models.mentor_match import MentorMatch
+from src.models.batch_run import BatchRun
+from src.utils.auth_decorators import require_role
+from src.utils.mentor_matching import refresh_mentor_matches, JOB_NAME
+
+mentorship_bp = Blueprint('mentorship', __name__)
+
+@mentorship_bp.route('/mentorship/matches', methods=['GET'])
+def get_mentor_matches():
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    
+    # Admins may look up any student of an institution they manage
+    student_id = request.args.get('student_id', type=int)
+    if student_id:
+        student = Student.query.get_or_404(student_id)
+        if student.user_id != user_id and not user.can_manage_institution(student.user.institution_id if student.user else None):
+            return jsonify({'success': False, 'message': 'Unauthorized'}), 403
+    else:
+        student = Student.query.filter_by(user_id=user_id).first()
+        if not student:
+            return jsonify({'success': False, 'message': 'Student profile not found'}), 404
+    
+    # Served from the stored matches only; the matching job rescores changed
+    # profiles, so a read never runs the matcher
+    matches = MentorMatch.query.filter_by(student_id=student.id).order_by(MentorMatch.rank).all()
+    computed_at = matches[0].computed_at if matches else None
+    
+    # One IN query for every mentor card; mentors who stepped down are dropped
+    mentors = {
+        alumni.id: alumni for alumni in Alumni.query.options(Alumni.card_query_options()).filter(
+            Alumni.id.in_([match.alumni_id for match in matches]),
+            Alumni.is_mentor == True
+        )
+    }
+    
+    viewer_role = session.get('user_role')
+    results = []
+    for match in matches:
+        mentor = mentors.get(match.alumni_id)
+        if mentor:
+            match_data = match.to_dict()
+            match_data['alumni'] = mentor.to_card_dict(viewer_role=viewer_role)
+            results.append(match_data)
+    
+    return jsonify({
+        'success': True,
+        'student_id': student.id,
+        'matches': results,
+        'computed_at': computed_at.isoformat() if computed_at else None
+    }), 200
+
+@mentorship_bp.route('/mentorship/refresh', methods=['POST'])
+@require_role([UserRole.SUPER_ADMIN])
+def refresh_matches():
+    full = bool((request.json or {}).get('full')) if request.is_json else False
+    scored = refresh_mentor_matches(full=full)
+    
+    return jsonify({
+        'success': True,
+        'students_scored': scored,
+        'run': BatchRun.query.get(JOB_NAME).to_dict()
+    }), 200
+
+@mentorship_bp.cli.command('refresh-matches')
+@click.option('--full', is_flag=True, help='Rescore every student instead of only changed ones')
+def refresh_matches_command(full):
+    """Recompute stored mentor matches"""
+    scored = refresh_mentor_matches(full=full)
+    print(f"Mentor matches refreshed for {scored} students")
@@ -1,56 +1,116 @@
-from flask import Blueprint, jsonify, request, session
-from src.models.message import Message, ForumPost, db
-from src.models.user import User
+import click
+from flask import Blueprint, current_app, jsonify, request, session
+from src.models.message import (
+    Message, ForumPost, Conversation, db, conversation_pair, mark_conversation_read, rebuild_conversations,
+    reconcile_unread_counts, unread_counters, unread_total, like_post, unlike_post, liked_post_ids
+)
+from src.models.user import User, UserRole
 from src.models.alumni import Alumni
+from src.models.message_archive import (
+    ArchivedMessage, archive_old_messages, archived_messages, archived_messages_by_id, reindex_archived_messages,
+    DEFAULT_ARCHIVE_AFTER_DAYS
+)
+from src.models.announcement import (
+    Announcement, announcement_summary, announcement_watermark, mark_announcements_read
+)
+from src.utils.auth_decorators import require_role
+from src.utils.pagination import (
+    get_page_size, keyset_paginate, after_cursor, decode_cursor, encode_cursor, InvalidCursor
+)
+from src.utils.fulltext import (
+    message_search_ranking, archived_message_search_ranking, message_snippets, text_snippet,
+    rebuild_message_search_index
+)
 
 messages_bp = Blueprint('messages', __name__)
 
+def _socketio():
+    """The app's Socket.IO server; imported late to avoid a circular import"""
+    import importlib
+    return getattr(importlib.import_module('src.index'), 'socketio', None)
+
+def _broadcast_read(conversation, reader_id, watermark):
+    """Send a read receipt (the reader's new watermark) to the conversation room"""
+    try:
+        socketio = _socketio()
+        if socketio:
+            socketio.emit('messages_read', {
+                'conversation_id': conversation.id,
+                'reader_id': reader_id,
+                'last_read_message_id': watermark
+            }, room=f"conversation_{conversation.user_low_id}_{conversation.user_high_id}")
+    except Exception as e:
+        print(f"WebSocket emission failed: {e}")
+
+def _load_profiles(user_ids):
+    """Users and alumni card rows for ``user_ids`` in two IN queries, keyed by user id"""
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return {}, {}
+    users = {user.id: user for user in User.query.filter(User.id.in_(user_ids))}
+    alumni = {
+        alum.user_id: alum for alum in Alumni.query.options(Alumni.card_query_options()).filter(
+            Alumni.user_id.in_(user_ids)
+        )
+    }
+    return users, alumni
+
 @messages_bp.route('/messages', methods=['GET'])
 def get_messages():
     user_id = session.get('user_id')
     if not user_id:
         return jsonify({'success': False, 'message': 'Not authenticated'}), 401
     
-    # Get messages where user is sender or recipient
-    messages = Message.query.filter(
-        (Message.sender_id == user_id) | (Message.recipient_id == user_id)
-    ).order_by(Message.created_at.desc()).all()
+    per_page = get_page_size(request.args.get('per_page'))
+    cursor = request.args.get('cursor')
+    sort_keys = [(Conversation.last_message_at, True), (Conversation.id, True)]
     
-    # Group messages by conversation
-    conversations = {}
-    for message in messages:
-        other_user_id = message.sender_id if message.recipient_id == user_id else message.recipient_id
-        
-        if other_user_id not in conversations:
-            other_user = User.query.get(other_user_id)
-            alumni = Alumni.query.filter_by(user_id=other_user_id).first()
-            
-            conversations[other_user_id] = {
-                'user': other_user.to_dict() if other_user else None,
-                'alumni': alumni.to_dict() if alumni else None,
-                'messages': [],
-                'unread_count': 0,
-                'last_message_date': None
-            }
-        
-        message_data = message.to_dict()
-        conversations[other_user_id]['messages'].append(message_data)
-        
-        # Count unread messages
-        if message.recipient_id == user_id and not message.is_read:
-            conversations[other_user_id]['unread_count'] += 1
+    # Each side of the pair walks its own (user, last_message_at, id) index;
+    # the union of the two pages is then paged once more
+    try:
+        branches = []
+        for column in (Conversation.user_low_id, Conversation.user_high_id):
+            branch = db.select(Conversation.id).where(column == user_id)
+            if cursor:
+                branch = branch.where(after_cursor(sort_keys, cursor))
+            branch = branch.order_by(Conversation.last_message_at.desc(), Conversation.id.desc()).limit(per_page + 1)
+            branches.append(db.select(branch.subquery().c.id))
         
-        # Update last message date
-        if not conversations[other_user_id]['last_message_date'] or message.created_at > conversations[other_user_id]['last_message_date']:
-            conversations[other_user_id]['last_message_date'] = message.created_at
+        conversations, next_cursor = keyset_paginate(
+            Conversation.query.filter(Conversation.id.in_(db.union_all(*branches))),
+            sort_keys, cursor=cursor, limit=per_page
+        )
+    except InvalidCursor:
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
     
-    # Convert to list and sort by last message date
-    conversations_list = list(conversations.values())
-    conversations_list.sort(key=lambda x: x['last_message_date'] or '', reverse=True)
+    # Institution announcements are merged in at read time, as one entry on
+    # the first page, rather than copied into every member's inbox
+    announcements = None
+    if not cursor:
+        user = User.query.get(user_id)
+        announcements = announcement_summary(user_id, user.institution_id) if user else None
+    
+    # Counterparts for the whole page in two IN queries
+    users, alumni = _load_profiles([conversation.other_user_id(user_id) for conversation in conversations])
+    
+    viewer_role = session.get('user_role')
+    conversations_list = []
+    for conversation in conversations:
+        other_user_id = conversation.other_user_id(user_id)
+        data = conversation.to_dict(user_id)
+        data['user'] = users[other_user_id].to_dict() if other_user_id in users else None
+        data['alumni'] = alumni[other_user_id].to_card_dict(viewer_role=viewer_role) if other_user_id in alumni else None
+        conversations_list.append(data)
     
     return jsonify({
         'success': True,
-        'conversations': conversations_list
+        'conversations': conversations_list,
+        'announcements': announcements,
+        'pagination': {
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
     }), 200
 
 @messages_bp.route('/messages/conversation/<int:other_user_id>', methods=['GET'])
@@ -59,19 +119,53 @@ def get_conversation(other_user_id):
     if not user_id:
         return jsonify({'success': False, 'message': 'Not authenticated'}), 401
     
-    # Get messages between current user and other user
-    messages = Message.query.filter(
-        ((Message.sender_id == user_id) & (Message.recipient_id == other_user_id)) |
-        ((Message.sender_id == other_user_id) & (Message.recipient_id == user_id))
-    ).order_by(Message.created_at.asc()).all()
-    
-    # Mark messages as read
-    Message.query.filter(
-        (Message.sender_id == other_user_id) & 
-        (Message.recipient_id == user_id) & 
-        (Message.is_read == False)
-    ).update({'is_read': True})
+    per_page = get_page_size(request.args.get('per_page'), max_setting='MESSAGES_MAX_PAGE_SIZE')
+    
+    low, high = conversation_pair(user_id, other_user_id)
+    conversation = Conversation.query.filter_by(user_low_id=low, user_high_id=high).first()
+    
+    # Latest page first; older pages are fetched with the returned cursor
+    messages, next_cursor = [], None
+    if conversation is not None:
+        cursor = request.args.get('cursor')
+        try:
+            messages, next_cursor = keyset_paginate(
+                Message.query.filter(Message.conversation_id == conversation.id),
+                [(Message.created_at, True), (Message.id, True)],
+                cursor=cursor,
+                limit=per_page
+            )
+            
+            # Past the hot table, history continues in the cold archive
+            if next_cursor is None:
+                if messages:
+                    before = (messages[-1].created_at, messages[-1].id)
+                else:
+                    before = tuple(decode_cursor(cursor, 2)) if cursor else None
+                older, has_more = archived_messages(conversation.id, before, per_page - len(messages))
+                messages += older
+                if has_more:
+                    next_cursor = encode_cursor([messages[-1].created_at, messages[-1].id])
+        except InvalidCursor:
+            return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+        messages.reverse()
+    
+    # Reading the page advances the watermark to the newest message on screen;
+    # serialized before the commit expires the rows
+    watermarks = {}
+    receipt = None
+    if conversation is not None and messages:
+        up_to = max(msg.id for msg in messages)
+        if up_to > conversation.read_up_to(user_id):
+            receipt = mark_conversation_read(conversation, user_id, up_to)
+        watermarks = {
+            user_id: max(conversation.read_up_to(user_id), up_to),
+            other_user_id: conversation.read_up_to(other_user_id)
+        }
+    messages_data = [msg.to_dict(read_up_to=watermarks.get(msg.recipient_id)) for msg in messages]
     db.session.commit()
+    if receipt is not None:
+        _broadcast_read(conversation, user_id, receipt)
     
     # Get other user info
     other_user = User.query.get(other_user_id)
@@ -79,9 +173,94 @@ def get_conversation(other_user_id):
     
     return jsonify({
         'success': True,
-        'messages': [msg.to_dict() for msg in messages],
+        'messages': messages_data,
         'other_user': other_user.to_dict() if other_user else None,
-        'other_user_alumni': alumni.to_dict() if alumni else None
+        'other_user_alumni': alumni.to_dict() if alumni else None,
+        'pagination': {
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+    }), 200
+
+@messages_bp.route('/messages/search', methods=['GET'])
+def search_messages():
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    
+    term = (request.args.get('q') or '').strip()
+    if not term:
+        return jsonify({'success': False, 'message': 'q is required'}), 400
+    per_page = get_page_size(request.args.get('per_page'), max_setting='MESSAGES_MAX_PAGE_SIZE')
+    
+    ranking = message_search_ranking(term)
+    if ranking is not None:
+        # Hot and archived matches in one ranked list; each side keeps only
+        # conversations the user takes part in
+        hot = db.select(ranking.c.message_id, ranking.c.rank, db.literal(False).label('archived')).join(
+            Message, Message.id == ranking.c.message_id
+        ).where((Message.sender_id == user_id) | (Message.recipient_id == user_id))
+        branches = [hot]
+        archive_ranking = archived_message_search_ranking(term)
+        if archive_ranking is not None:
+            branches.append(db.select(
+                archive_ranking.c.message_id, archive_ranking.c.rank, db.literal(True).label('archived')
+            ).join(
+                ArchivedMessage, ArchivedMessage.message_id == archive_ranking.c.message_id
+            ).where((ArchivedMessage.sender_id == user_id) | (ArchivedMessage.recipient_id == user_id)))
+        hits = db.union_all(*branches).subquery('hits')
+        query = db.session.query(hits)
+        sort_keys = [(hits.c.rank, False), (hits.c.message_id, False)]
+    else:
+        # No full-text index on this database: newest hot matches first
+        query = Message.query.filter(
+            (Message.sender_id == user_id) | (Message.recipient_id == user_id),
+            Message.content.ilike(f'%{term}%')
+        )
+        sort_keys = [(Message.id, True)]
+    
+    try:
+        rows, next_cursor = keyset_paginate(query, sort_keys, cursor=request.args.get('cursor'), limit=per_page)
+    except InvalidCursor:
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    
+    if ranking is not None:
+        hot_ids = [row.message_id for row in rows if not row.archived]
+        hot = {msg.id: msg for msg in Message.query.filter(Message.id.in_(hot_ids))} if hot_ids else {}
+        archived = archived_messages_by_id([row.message_id for row in rows if row.archived])
+        messages = [hot.get(row.message_id) or archived.get(row.message_id) for row in rows]
+        messages = [msg for msg in messages if msg is not None]
+        snippets = message_snippets(hot_ids, term)
+    else:
+        messages = rows
+        snippets = {}
+    
+    # Read state comes from the conversations' watermarks, one IN query per page
+    conversation_ids = {msg.conversation_id for msg in messages if msg.conversation_id is not None}
+    conversations = {
+        conversation.id: conversation
+        for conversation in Conversation.query.filter(Conversation.id.in_(conversation_ids))
+    } if conversation_ids else {}
+    
+    results = []
+    for msg in messages:
+        conversation = conversations.get(msg.conversation_id)
+        snippet = snippets.get(msg.id) or (text_snippet(msg.content, term) if ranking is not None else msg.content[:200])
+        results.append({
+            'message': msg.to_dict(read_up_to=conversation.read_up_to(msg.recipient_id) if conversation else None),
+            'other_user_id': msg.recipient_id if msg.sender_id == user_id else msg.sender_id,
+            'snippet': snippet
+        })
+    
+    return jsonify({
+        'success': True,
+        'results': results,
+        'pagination': {
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
     }), 200
 
 @messages_bp.route('/messages', methods=['POST'])
@@ -92,6 +271,9 @@ def send_message():
     
     data = request.json
     
+    if data.get('message_type') == 'announcement':
+        return jsonify({'success': False, 'message': 'Announcements are posted to /announcements'}), 400
+    
     message = Message(
         sender_id=user_id,
         recipient_id=data['recipient_id'],
@@ -105,10 +287,7 @@ def send_message():
     
     # Emit the message to WebSocket clients via global socketio
     try:
-        # Import here to avoid circular import
-        import importlib
-        index_module = importlib.import_module('src.index')
-        socketio = getattr(index_module, 'socketio', None)
+        socketio = _socketio()
         
         if socketio:
             message_data = message.to_dict()
@@ -153,40 +332,166 @@ def mark_message_read(message_id):
     if message.recipient_id != user_id:
         return jsonify({'success': False, 'message': 'Unauthorized'}), 403
     
-    message.is_read = True
+    conversation = Conversation.query.get(message.conversation_id)
+    watermark = mark_conversation_read(conversation, user_id, message.id)
+    db.session.commit()
+    _broadcast_read(conversation, user_id, watermark)
+    
+    return jsonify({
+        'success': True,
+        'message': 'Message marked as read',
+        'last_read_message_id': watermark
+    }), 200
+
+# Announcements
+@messages_bp.route('/announcements', methods=['GET'])
+def get_announcements():
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    
+    user = User.query.get(user_id)
+    if not user or user.institution_id is None:
+        return jsonify({'success': False, 'message': 'No institution'}), 404
+    
+    per_page = get_page_size(request.args.get('per_page'), max_setting='MESSAGES_MAX_PAGE_SIZE')
+    try:
+        announcements, next_cursor = keyset_paginate(
+            Announcement.query.filter_by(institution_id=user.institution_id),
+            [(Announcement.id, True)],
+            cursor=request.args.get('cursor'),
+            limit=per_page
+        )
+    except InvalidCursor:
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    
+    # Reading the page advances the member's watermark, as for conversations
+    watermark = announcement_watermark(user_id, user.institution_id)
+    announcements_data = [announcement.to_dict(read_up_to=watermark) for announcement in announcements]
+    if announcements and announcements[0].id > watermark:
+        mark_announcements_read(user_id, user.institution_id, announcements[0].id)
+        watermark = announcements[0].id
     db.session.commit()
     
     return jsonify({
         'success': True,
-        'message': 'Message marked as read'
+        'announcements': announcements_data,
+        'last_read_announcement_id': watermark,
+        'pagination': {
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+    }), 200
+
+@messages_bp.route('/announcements', methods=['POST'])
+@require_role([UserRole.SUPER_ADMIN, UserRole.INSTITUTION_ADMIN])
+def create_announcement():
+    current_user = User.query.get(session.get('user_id'))
+    data = request.json or {}
+    
+    institution_id = data.get('institution_id') if current_user.is_super_admin() else current_user.institution_id
+    if institution_id is None:
+        return jsonify({'success': False, 'message': 'institution_id is required'}), 400
+    if not current_user.can_manage_institution(institution_id):
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 403
+    if not data.get('subject') or not data.get('content'):
+        return jsonify({'success': False, 'message': 'subject and content are required'}), 400
+    
+    # One row however many members the institution has; members pick it up
+    # from their inbox, and connected clients from one room broadcast
+    announcement = Announcement(
+        institution_id=institution_id,
+        author_id=current_user.id,
+        subject=data['subject'],
+        content=data['content']
+    )
+    db.session.add(announcement)
+    db.session.commit()
+    
+    announcement_data = announcement.to_dict()
+    try:
+        socketio = _socketio()
+        if socketio:
+            socketio.emit('announcement', announcement_data, room=f"institution_{institution_id}")
+    except Exception as e:
+        print(f"WebSocket emission failed: {e}")
+    
+    return jsonify({
+        'success': True,
+        'announcement': announcement_data
+    }), 201
+
+@messages_bp.route('/announcements/read', methods=['PUT'])
+def read_announcements():
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    
+    user = User.query.get(user_id)
+    if not user or user.institution_id is None:
+        return jsonify({'success': False, 'message': 'No institution'}), 404
+    
+    # Up to a given announcement, or everything posted so far; never past the
+    # latest one, so later announcements still arrive unread
+    up_to = (request.get_json(silent=True) or {}).get('up_to')
+    if up_to is not None and (not isinstance(up_to, int) or isinstance(up_to, bool)):
+        return jsonify({'success': False, 'message': 'up_to must be an announcement id'}), 400
+    latest = db.session.scalar(
+        db.select(db.func.max(Announcement.id)).where(Announcement.institution_id == user.institution_id)
+    ) or 0
+    up_to = latest if up_to is None else min(up_to, latest)
+    
+    mark_announcements_read(user_id, user.institution_id, up_to)
+    db.session.commit()
+    
+    return jsonify({
+        'success': True,
+        'last_read_announcement_id': announcement_watermark(user_id, user.institution_id)
     }), 200
 
 # Forum Posts
 @messages_bp.route('/forum/posts', methods=['GET'])
 def get_forum_posts():
     category = request.args.get('category')
+    per_page = get_page_size(request.args.get('per_page'))
     
     query = ForumPost.query
     
     if category and category != 'all':
         query = query.filter(ForumPost.category == category)
     
-    posts = query.order_by(ForumPost.created_at.desc()).all()
+    try:
+        posts, next_cursor = keyset_paginate(
+            query,
+            [(ForumPost.created_at, True), (ForumPost.id, True)],
+            cursor=request.args.get('cursor'),
+            limit=per_page
+        )
+    except InvalidCursor:
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    
+    # Authors for the whole page in two IN queries, plus the viewer's likes in one
+    users, alumni = _load_profiles([post.author_id for post in posts])
+    liked = liked_post_ids(session.get('user_id'), [post.id for post in posts])
     
-    # Add author info to each post
+    viewer_role = session.get('user_role')
     posts_data = []
     for post in posts:
         post_data = post.to_dict()
-        author = User.query.get(post.author_id)
-        alumni = Alumni.query.filter_by(user_id=post.author_id).first()
-        
-        post_data['author'] = author.to_dict() if author else None
-        post_data['author_alumni'] = alumni.to_dict() if alumni else None
+        post_data['author'] = users[post.author_id].to_card_dict() if post.author_id in users else None
+        post_data['author_alumni'] = alumni[post.author_id].to_card_dict(viewer_role=viewer_role) if post.author_id in alumni else None
+        post_data['liked'] = post.id in liked
         posts_data.append(post_data)
     
     return jsonify({
         'success': True,
-        'posts': posts_data
+        'posts': posts_data,
+        'pagination': {
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
     }), 200
 
 @messages_bp.route('/forum/posts', methods=['POST'])
@@ -218,13 +523,34 @@ def like_forum_post(post_id):
     if not user_id:
         return jsonify({'success': False, 'message': 'Not authenticated'}), 401
     
-    post = ForumPost.query.get_or_404(post_id)
-    post.likes_count += 1
+    ForumPost.query.get_or_404(post_id)
+    
+    # One row per (post, user) and an in-SQL increment: repeat likes are
+    # no-ops and concurrent likes cannot lose updates
+    _, likes_count = like_post(post_id, user_id)
     db.session.commit()
     
     return jsonify({
         'success': True,
-        'likes_count': post.likes_count
+        'liked': True,
+        'likes_count': likes_count
+    }), 200
+
+@messages_bp.route('/forum/posts/<int:post_id>/like', methods=['DELETE'])
+def unlike_forum_post(post_id):
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    
+    ForumPost.query.get_or_404(post_id)
+    
+    _, likes_count = unlike_post(post_id, user_id)
+    db.session.commit()
+    
+    return jsonify({
+        'success': True,
+        'liked': False,
+        'likes_count': likes_count
     }), 200
 
 @messages_bp.route('/unread-count', methods=['GET'])
@@ -233,13 +559,43 @@ def get_unread_count():
     if not user_id:
         return jsonify({'success': False, 'message': 'Not authenticated'}), 401
     
-    unread_count = Message.query.filter_by(
-        recipient_id=user_id,
-        is_read=False
-    ).count()
+    # Cached total, seeded from the conversation counters on a miss; clients
+    # connected over Socket.IO receive changes without polling
+    unread_count = unread_counters.get(user_id, compute=lambda: unread_total(user_id))
+    
+    user = User.query.get(user_id)
+    announcements = announcement_summary(user_id, user.institution_id) if user else None
     
     return jsonify({
         'success': True,
-        'unread_count': unread_count
+        'unread_count': unread_count,
+        'unread_announcements': announcements['unread_count'] if announcements else 0
     }), 200
 
+@messages_bp.cli.command('rebuild-conversations')
+def rebuild_conversations_command():
+    """Recompute inbox conversation summaries from the messages table"""
+    conversations = rebuild_conversations()
+    print(f"Conversation summaries rebuilt ({conversations} conversations)")
+
+@messages_bp.cli.command('reconcile-unread')
+def reconcile_unread_command():
+    """Correct cached unread counters against the messages table"""
+    corrected = reconcile_unread_counts()
+    print(f"Unread counters reconciled ({corrected} corrected)")
+
+@messages_bp.cli.command('rebuild-message-search-index')
+def rebuild_message_search_index_command():
+    """Repopulate the message full-text search indexes, archived messages included"""
+    rebuild_message_search_index()
+    archived = reindex_archived_messages()
+    print(f"Message search index rebuilt ({archived} archived messages)")
+
+@messages_bp.cli.command('archive-messages')
+@click.option('--older-than-days', type=int, default=None, help='Archive age (default MESSAGE_ARCHIVE_AFTER_DAYS)')
+def archive_messages_command(older_than_days):
+    """Move old read messages into compressed archive segments"""
+    if older_than_days is None:
+        older_than_days = current_app.config.get('MESSAGE_ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+    archived = archive_old_messages(older_than_days)
+    print(f"Archived {archived} messages older than {older_than_days} days")
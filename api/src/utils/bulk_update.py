@@ -0,0 +1,154 @@
+import json
+from datetime import datetime
+from sqlalchemy import select, update
+from src.models.user import db, User
+from src.models.alumni import Alumni
+from src.models.alumni_stats import recount_alumni
+from src.models.skill import sync_alumni_skills
+from src.utils.trigram import name_index
+
+# Bulk alumni updates.
+#
+# Rows are written with set-based UPDATE statements (one per group of rows
+# sharing the same changes, executemany for the rest), which skip the per-row
+# ORM flush and therefore the Alumni mapper events. The derived state those
+# events maintain - stats rollup, skill index, trigram names, materialized
+# scores and locations - is repaired here in the same transaction instead.
+# The full-text index is kept by the database itself.
+
+IN_CHUNK_SIZE = 500
+
+# Columns an admin may change in bulk; strings are length-checked against the column
+BULK_UPDATE_FIELDS = (
+    'first_name', 'last_name', 'graduation_year', 'department', 'degree_type', 'major',
+    'current_position', 'current_company', 'industry', 'work_location', 'location',
+    'bio', 'skills', 'linkedin_url', 'is_mentor', 'is_verified'
+)
+STAT_FIELDS = ('graduation_year', 'department', 'is_mentor')
+NAME_FIELDS = ('first_name', 'last_name')
+
+
+def _chunks(items, size=IN_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def validate_alumni_changes(values):
+    """Return a list of error messages for a {field: value} change set"""
+    if not isinstance(values, dict) or not values:
+        return ['At least one field to update is required']
+
+    errors = []
+    for name, value in values.items():
+        if name not in BULK_UPDATE_FIELDS:
+            errors.append(f'{name} cannot be updated in bulk')
+            continue
+
+        column = Alumni.__table__.c[name]
+        if value is None:
+            if not column.nullable:
+                errors.append(f'{name} is required')
+        elif name == 'graduation_year':
+            if isinstance(value, bool) or not isinstance(value, int) or not 1900 <= value <= 2100:
+                errors.append('graduation_year must be a year')
+        elif name in ('is_mentor', 'is_verified'):
+            if not isinstance(value, bool):
+                errors.append(f'{name} must be true or false')
+        elif name == 'skills':
+            if not isinstance(value, list):
+                errors.append('skills must be a list')
+        elif not isinstance(value, str):
+            errors.append(f'{name} must be a string')
+        elif not column.nullable and not value.strip():
+            errors.append(f'{name} is required')
+        elif getattr(column.type, 'length', None) and len(value) > column.type.length:
+            errors.append(f'{name} must be at most {column.type.length} characters')
+    return errors
+
+
+def _stat_rows(connection, ids):
+    """{alumni_id: (institution_id, graduation_year, department, is_mentor)}"""
+    rows = {}
+    for chunk in _chunks(ids):
+        for row in connection.execute(
+            select(Alumni.id, User.institution_id, Alumni.graduation_year, Alumni.department, Alumni.is_mentor)
+            .select_from(Alumni).outerjoin(User, User.id == Alumni.user_id)
+            .where(Alumni.id.in_(chunk))
+        ):
+            rows[row[0]] = tuple(row[1:])
+    return rows
+
+
+def apply_alumni_updates(updates):
+    """Apply {alumni_id: {field: value}} with set-based UPDATEs; the caller commits.
+
+    Changes must already be validated. Returns the number of rows updated.
+    """
+    if not updates:
+        return 0
+
+    ids = sorted(updates)
+    fields = set().union(*updates.values())
+    connection = db.session.connection()
+    before = _stat_rows(connection, ids) if fields & set(STAT_FIELDS) else None
+    now = datetime.utcnow()
+
+    # Rows receiving identical changes share one UPDATE ... WHERE id IN (...)
+    groups = {}
+    for alumni_id in ids:
+        key = json.dumps(updates[alumni_id], sort_keys=True)
+        groups.setdefault(key, []).append(alumni_id)
+
+    by_primary_key = []
+    for group_ids in groups.values():
+        values = updates[group_ids[0]]
+        if len(group_ids) == 1:
+            by_primary_key.append(dict(values, id=group_ids[0], updated_at=now))
+            continue
+        for chunk in _chunks(group_ids):
+            db.session.execute(
+                update(Alumni).where(Alumni.id.in_(chunk)).values(updated_at=now, **values),
+                execution_options={'synchronize_session': False}
+            )
+    if by_primary_key:
+        # ORM bulk UPDATE by primary key: executemany per distinct key set
+        db.session.execute(update(Alumni), by_primary_key)
+
+    if before is not None:
+        after = []
+        for alumni_id, (institution_id, *old) in before.items():
+            new = [updates[alumni_id].get(name, value) for name, value in zip(STAT_FIELDS, old)]
+            after.append((institution_id, *new))
+        recount_alumni(connection, list(before.values()), after)
+
+    for alumni_id in ids:
+        if 'skills' in updates[alumni_id]:
+            sync_alumni_skills(connection, alumni_id, updates[alumni_id]['skills'])
+
+    derived = set(Alumni.SCORE_FIELDS) | set(Alumni.LOCATION_FIELDS) | set(NAME_FIELDS)
+    if fields & derived:
+        _refresh_derived(ids, fields)
+
+    return len(ids)
+
+
+def _refresh_derived(ids, fields):
+    """Recompute materialized scores/locations and the name index for updated rows"""
+    rescore = bool(fields & set(Alumni.SCORE_FIELDS))
+    relocate = bool(fields & set(Alumni.LOCATION_FIELDS))
+    rename = bool(fields & set(NAME_FIELDS))
+
+    for chunk in _chunks(ids):
+        batch = db.session.scalars(
+            select(Alumni).where(Alumni.id.in_(chunk)).execution_options(populate_existing=True)
+        ).all()
+        for alumni in batch:
+            if rescore:
+                alumni.refresh_scores()
+            if relocate:
+                alumni.refresh_location()
+            if rename:
+                name_index.update(alumni.id, alumni.get_full_name())
+        db.session.flush()
+        for alumni in batch:
+            db.session.expunge(alumni)
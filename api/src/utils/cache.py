@@ -0,0 +1,270 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, session
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Redis is optional; without it every worker keeps its own LRU
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Response caches for read-heavy endpoints.
+#
+# Entries are keyed by endpoint, the normalized request parameters and the
+# viewer's privacy class. Writes to the watched models invalidate a cache at
+# commit time via SQLAlchemy session events. The in-process LRU is cleared
+# in the committing worker only, so other workers can serve a stale page for
+# up to the TTL; with REDIS_URL set, invalidation bumps a shared generation
+# that every worker checks.
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 1024
+ADMIN_ROLES = ('super_admin', 'institution_admin')
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with a per-entry TTL"""
+
+    backend = 'memory'
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+
+
+class RedisCache:
+    """Shared cache in Redis; invalidation bumps a generation in the key.
+
+    Redis evicts and expires on its own, so those counters come from the
+    server (keyspace-wide) rather than from this cache.
+    """
+
+    backend = 'redis'
+
+    def __init__(self, client, namespace, ttl=DEFAULT_TTL):
+        self.client = client
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = self.misses = self.errors = 0
+
+    def _generation(self):
+        return int(self.client.get(f'cache:{self.namespace}:generation') or 0)
+
+    def get(self, key):
+        try:
+            value = self.client.get(f'cache:{self.namespace}:{self._generation()}:{key}')
+        except redis.RedisError:
+            self.errors += 1
+            return None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        try:
+            self.client.set(f'cache:{self.namespace}:{self._generation()}:{key}', value, ex=self.ttl)
+        except redis.RedisError:
+            self.errors += 1
+
+    def invalidate(self):
+        try:
+            self.client.incr(f'cache:{self.namespace}:generation')
+        except redis.RedisError:
+            self.errors += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        data = {
+            'backend': self.backend,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'errors': self.errors
+        }
+        try:
+            server = self.client.info('stats')
+            data['evictions'] = server.get('evicted_keys')
+            data['expirations'] = server.get('expired_keys')
+        except redis.RedisError:
+            pass
+        return data
+
+
+class ResponseCache:
+    """A named response cache, invalidated when any of ``models`` is written"""
+
+    def __init__(self, name, models):
+        self.name = name
+        self.models = tuple(models)
+        self._store = None
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = self._create_store()
+        return self._store
+
+    def _create_store(self):
+        config = current_app.config
+        ttl = config.get('RESPONSE_CACHE_TTL', DEFAULT_TTL)
+        redis_url = config.get('REDIS_URL') or os.environ.get('REDIS_URL')
+        if redis_url and REDIS_AVAILABLE:
+            try:
+                client = redis.Redis.from_url(redis_url, socket_timeout=0.1)
+                client.ping()
+                return RedisCache(client, self.name, ttl=ttl)
+            except redis.RedisError as e:
+                print(f"Warning: Redis unavailable for {self.name} cache, using in-process LRU: {e}")
+        return LRUCache(max_entries=config.get('RESPONSE_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES), ttl=ttl)
+
+    def invalidate(self):
+        if self._store is not None:
+            self._store.invalidate()
+
+    def stats(self):
+        return self.store.stats()
+
+
+_caches = []
+
+
+def response_cache(name, models):
+    """Create a response cache invalidated by commits touching ``models``"""
+    cache = ResponseCache(name, models)
+    _caches.append(cache)
+    return cache
+
+
+def viewer_privacy_class():
+    """Privacy class of the current viewer; responses differ only between classes"""
+    return 'admin' if session.get('user_role') in ADMIN_ROLES else 'member'
+
+
+def request_cache_key():
+    """Endpoint + normalized query string / JSON body + viewer privacy class"""
+    params = sorted((key, sorted(values)) for key, values in request.args.lists())
+    body = request.get_json(silent=True) if request.method == 'POST' else None
+    raw = json.dumps(
+        [request.endpoint, params, body, viewer_privacy_class()],
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def cached_response(cache):
+    """Serve successful JSON responses of the wrapped view from ``cache``"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = request_cache_key()
+            body = cache.store.get(key)
+            if body is not None:
+                response = current_app.response_class(body, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code == 200 and response.mimetype == 'application/json':
+                cache.store.set(key, response.get_data())
+                response.headers['X-Cache'] = 'MISS'
+            return response
+        return decorated_function
+    return decorator
+
+
+# --- Write invalidation ---
+#
+# after_flush notes which caches the flushed objects belong to; after_commit
+# invalidates them, so a rolled-back write never empties a cache. Bulk
+# query.update()/delete() bypass the flush and are caught in do_orm_execute.
+
+def _mark(session, classes):
+    pending = session.info.setdefault('invalidate_caches', set())
+    for cache in _caches:
+        if any(issubclass(cls, cache.models) for cls in classes):
+            pending.add(cache)
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_flushed_writes(session, flush_context):
+    classes = {type(obj) for obj in session.new | session.dirty | session.deleted}
+    if classes:
+        _mark(session, classes)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _note_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _mark(orm_execute_state.session, {mapper.class_})
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_writes(session):
+    for cache in session.info.pop('invalidate_caches', ()):
+        cache.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_writes(session):
+    session.info.pop('invalidate_caches', None)
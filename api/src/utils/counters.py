@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from flask import current_app
+
+# Redis is optional; without it every worker keeps its own counters
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Cached integer counters (e.g. unread messages per user).
+#
+# The database stays the source of truth: a missing key means "not cached",
+# callers compute the value and seed it. Increments only apply to keys that
+# are already cached, so a worker that never saw the seed cannot invent a
+# count. Subscribers are told about every change, which is how new values are
+# pushed to clients.
+#
+# With REDIS_URL set every worker shares one set of counters, and the
+# reconcile job corrects any drift in them. Without it each worker caches its
+# own copy and only sees the changes it commits itself, and a reconcile run
+# from the CLI cannot reach a serving worker's memory. In-process entries
+# therefore expire after COUNTER_CACHE_TTL seconds and are recomputed from the
+# database. A multi-worker deployment without Redis shows counts up to that
+# old. Run Redis when badges must be exact across workers.
+
+DEFAULT_TTL = 30
+
+
+class MemoryCounters:
+    """Thread-safe in-process counters that expire ``ttl`` seconds after being set"""
+
+    backend = 'memory'
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        """The (expires_at, value) entry for ``key``, dropping it once expired; lock held"""
+        entry = self._values.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._values[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return entry[1] if entry else None
+
+    def set(self, key, value):
+        with self._lock:
+            self._values[key] = (time.monotonic() + self.ttl, value)
+
+    def incr(self, key, delta):
+        """Add ``delta`` to a cached counter; returns None when not cached.
+
+        The expiry is left alone, so a counter is recomputed ``ttl`` seconds
+        after it was seeded however often it is bumped.
+        """
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return None
+            value = max(entry[1] + delta, 0)
+            self._values[key] = (entry[0], value)
+            return value
+
+    def snapshot(self):
+        with self._lock:
+            values = {}
+            for key in list(self._values):
+                entry = self._live(key)
+                if entry is not None:
+                    values[key] = entry[1]
+            return values
+
+
+# Increment only when the key exists, floored at zero, atomically
+_INCR_IF_CACHED = """
+if redis.call('exists', KEYS[1]) == 0 then return nil end
+local value = redis.call('incrby', KEYS[1], ARGV[1])
+if value < 0 then redis.call('set', KEYS[1], 0) return 0 end
+return value
+"""
+
+
+class RedisCounters:
+    """Counters shared by every worker through Redis"""
+
+    backend = 'redis'
+
+    def __init__(self, client, namespace):
+        self.client = client
+        self.prefix = f'counter:{namespace}:'
+        self._incr = client.register_script(_INCR_IF_CACHED)
+
+    def get(self, key):
+        try:
+            value = self.client.get(self.prefix + str(key))
+        except redis.RedisError:
+            return None
+        return int(value) if value is not None else None
+
+    def set(self, key, value):
+        try:
+            self.client.set(self.prefix + str(key), value)
+        except redis.RedisError:
+            pass
+
+    def incr(self, key, delta):
+        try:
+            value = self._incr(keys=[self.prefix + str(key)], args=[delta])
+        except redis.RedisError:
+            return None
+        return int(value) if value is not None else None
+
+    def snapshot(self):
+        values = {}
+        try:
+            for name in self.client.scan_iter(match=self.prefix + '*', count=1000):
+                name = name.decode() if isinstance(name, bytes) else name
+                value = self.client.get(name)
+                if value is not None:
+                    values[int(name[len(self.prefix):])] = int(value)
+        except redis.RedisError:
+            pass
+        return values
+
+
+class CounterStore:
+    """A named family of cached counters keyed by integer id"""
+
+    def __init__(self, name):
+        self.name = name
+        self._store = None
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    @property
+    def store(self):
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = self._create_store()
+        return self._store
+
+    def _create_store(self):
+        redis_url = current_app.config.get('REDIS_URL') or os.environ.get('REDIS_URL')
+        if redis_url and REDIS_AVAILABLE:
+            try:
+                client = redis.Redis.from_url(redis_url, socket_timeout=0.1)
+                client.ping()
+                return RedisCounters(client, self.name)
+            except redis.RedisError as e:
+                print(f"Warning: Redis unavailable for {self.name} counters, using in-process counters: {e}")
+        return MemoryCounters(ttl=current_app.config.get('COUNTER_CACHE_TTL', DEFAULT_TTL))
+
+    def subscribe(self, callback):
+        """Call ``callback(key, value)`` whenever a counter changes"""
+        self._subscribers.append(callback)
+        return callback
+
+    def _notify(self, key, value):
+        for callback in self._subscribers:
+            try:
+                callback(key, value)
+            except Exception as e:
+                print(f"Counter subscriber failed for {self.name}: {e}")
+
+    def get(self, key, compute=None):
+        """Cached value of ``key``; on a miss, seed it from ``compute()`` if given"""
+        value = self.store.get(key)
+        if value is None and compute is not None:
+            value = compute()
+            self.store.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.store.set(key, value)
+        self._notify(key, value)
+
+    def incr(self, key, delta=1):
+        value = self.store.incr(key, delta)
+        if value is not None:
+            self._notify(key, value)
+        return value
+
+    def snapshot(self):
+        return self.store.snapshot()
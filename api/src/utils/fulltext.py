@@ -0,0 +1,415 @@
+import re
+from sqlalchemy import inspect, text, select, func, literal_column, bindparam, Float, Integer
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from src.models.user import db
+
+# Full-text search indexes.
+#
+# SQLite deployments get an FTS5 virtual table kept in sync by triggers on the
+# base table; Postgres gets a generated tsvector column with a GIN index. Both
+# are maintained by the database itself, so bulk UPDATEs and imports stay
+# indexed without any application hooks.
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Backend per (database URL, indexed table): 'fts5', 'tsvector' or None when unavailable
+_backends = {}
+
+
+def _skills_text(ref):
+    """SQLite expression flattening a JSON skills array (strings or {name: ...})"""
+    return (
+        "(SELECT group_concat(CASE WHEN type = 'object' "
+        "THEN json_extract(value, '$.name') ELSE value END, ' ') "
+        f"FROM json_each({ref}))"
+    )
+
+
+ALUMNI_FTS_COLUMNS = 'first_name, last_name, current_company, current_position, skills'
+
+
+def _alumni_fts_values(ref):
+    return (
+        f"{ref}.id, {ref}.first_name, {ref}.last_name, {ref}.current_company, "
+        f"{ref}.current_position, {_skills_text(ref + '.skills')}"
+    )
+
+
+SQLITE_ALUMNI_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS alumni_fts USING fts5(
+        {ALUMNI_FTS_COLUMNS}, tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS alumni_fts_ai AFTER INSERT ON alumni BEGIN
+        INSERT INTO alumni_fts(rowid, {ALUMNI_FTS_COLUMNS}) VALUES ({_alumni_fts_values('new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS alumni_fts_au
+        AFTER UPDATE OF first_name, last_name, current_company, current_position, skills ON alumni BEGIN
+        DELETE FROM alumni_fts WHERE rowid = old.id;
+        INSERT INTO alumni_fts(rowid, {ALUMNI_FTS_COLUMNS}) VALUES ({_alumni_fts_values('new')});
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS alumni_fts_ad AFTER DELETE ON alumni BEGIN
+        DELETE FROM alumni_fts WHERE rowid = old.id;
+    END""",
+]
+
+POSTGRES_ALUMNI_DDL = [
+    """ALTER TABLE alumni ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(current_company, '') || ' ' || coalesce(current_position, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(skills::text, '')), 'C')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_alumni_search_vector ON alumni USING GIN (search_vector)",
+]
+
+
+MESSAGE_FTS_COLUMNS = 'content, subject'
+
+# External-content table: the text lives only in the messages table
+SQLITE_MESSAGE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS message_fts USING fts5(
+        {MESSAGE_FTS_COLUMNS}, content = 'message', content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS message_fts_ai AFTER INSERT ON message BEGIN
+        INSERT INTO message_fts(rowid, {MESSAGE_FTS_COLUMNS}) VALUES (new.id, new.content, new.subject);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS message_fts_au AFTER UPDATE OF content, subject ON message BEGIN
+        INSERT INTO message_fts(message_fts, rowid, {MESSAGE_FTS_COLUMNS})
+            VALUES ('delete', old.id, old.content, old.subject);
+        INSERT INTO message_fts(rowid, {MESSAGE_FTS_COLUMNS}) VALUES (new.id, new.content, new.subject);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS message_fts_ad AFTER DELETE ON message BEGIN
+        INSERT INTO message_fts(message_fts, rowid, {MESSAGE_FTS_COLUMNS})
+            VALUES ('delete', old.id, old.content, old.subject);
+    END""",
+]
+
+POSTGRES_MESSAGE_DDL = [
+    """ALTER TABLE message ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(subject, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_message_search_vector ON message USING GIN (search_vector)",
+]
+
+# Archived messages keep their text only in compressed segments, so their
+# index stores terms without content: a contentless FTS5 table on SQLite, a
+# plain tsvector column filled at archive time on Postgres. Rows are keyed by
+# message id and joined to message_archive_entries for visibility.
+SQLITE_ARCHIVE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS message_archive_fts USING fts5(
+        {MESSAGE_FTS_COLUMNS}, content = '', tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+]
+
+POSTGRES_ARCHIVE_DDL = [
+    "ALTER TABLE message_archive_entries ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_message_archive_search_vector ON message_archive_entries USING GIN (search_vector)",
+]
+
+# Snippet markup and size, shared by both backends
+SNIPPET_START, SNIPPET_STOP, SNIPPET_ELLIPSIS = '<mark>', '</mark>', '…'
+SNIPPET_WORDS = 12
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def _run_ddl(statements):
+    with db.engine.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+
+
+def init_alumni_search_index():
+    """Create the alumni search index if the database supports one"""
+    dialect = _dialect()
+    key = (str(db.engine.url), 'alumni')
+    try:
+        if dialect == 'sqlite':
+            existed = inspect(db.engine).has_table('alumni_fts')
+            _run_ddl(SQLITE_ALUMNI_DDL)
+            _backends[key] = 'fts5'
+            if not existed:
+                rebuild_alumni_search_index()
+        elif dialect == 'postgresql':
+            _run_ddl(POSTGRES_ALUMNI_DDL)
+            _backends[key] = 'tsvector'
+        else:
+            _backends[key] = None
+    except (OperationalError, ProgrammingError) as e:
+        print(f"Warning: full-text search unavailable, falling back to ILIKE: {e}")
+        _backends[key] = None
+
+
+def rebuild_alumni_search_index():
+    """Repopulate the alumni search index from the alumni table"""
+    dialect = _dialect()
+    if dialect == 'sqlite':
+        _run_ddl([
+            "DELETE FROM alumni_fts",
+            f"INSERT INTO alumni_fts(rowid, {ALUMNI_FTS_COLUMNS}) "
+            f"SELECT {_alumni_fts_values('alumni')} FROM alumni",
+        ])
+    elif dialect == 'postgresql':
+        # Generated column; a REINDEX is all that can drift
+        _run_ddl(["REINDEX INDEX ix_alumni_search_vector"])
+
+
+def alumni_search_backend():
+    """Return the active search backend for the current database, or None"""
+    key = (str(db.engine.url), 'alumni')
+    if key not in _backends:
+        dialect = _dialect()
+        if dialect == 'sqlite':
+            _backends[key] = 'fts5' if inspect(db.engine).has_table('alumni_fts') else None
+        elif dialect == 'postgresql':
+            columns = {c['name'] for c in inspect(db.engine).get_columns('alumni')}
+            _backends[key] = 'tsvector' if 'search_vector' in columns else None
+        else:
+            _backends[key] = None
+    return _backends[key]
+
+
+def search_tokens(term):
+    return [token.lower() for token in TOKEN_PATTERN.findall(term or '')]
+
+
+def alumni_search_ranking(term):
+    """Subquery of (alumni_id, rank) for alumni matching ``term``.
+
+    Every token must match (as a prefix, so it works while the user types).
+    Lower rank is a better match on both backends. Returns None when there is
+    no usable index or the term has no searchable tokens.
+    """
+    tokens = search_tokens(term)
+    backend = alumni_search_backend()
+    if not tokens or backend is None:
+        return None
+
+    if backend == 'fts5':
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        return text(
+            "SELECT rowid AS alumni_id, bm25(alumni_fts, 10.0, 10.0, 4.0, 4.0, 2.0) AS rank "
+            "FROM alumni_fts WHERE alumni_fts MATCH :match"
+        ).bindparams(match=match).columns(alumni_id=Integer, rank=Float).subquery('alumni_search')
+
+    vector = literal_column('alumni.search_vector')
+    query = func.to_tsquery('simple', ' & '.join(f'{token}:*' for token in tokens))
+    return select(
+        literal_column('alumni.id', Integer).label('alumni_id'),
+        (-func.ts_rank(vector, query)).label('rank')
+    ).select_from(text('alumni')).where(vector.op('@@')(query)).subquery('alumni_search')
+
+
+def init_message_search_index():
+    """Create the message search index if the database supports one"""
+    dialect = _dialect()
+    key = (str(db.engine.url), 'message')
+    try:
+        if dialect == 'sqlite':
+            existed = inspect(db.engine).has_table('message_fts')
+            _run_ddl(SQLITE_MESSAGE_DDL)
+            _backends[key] = 'fts5'
+            if not existed:
+                rebuild_message_search_index()
+        elif dialect == 'postgresql':
+            _run_ddl(POSTGRES_MESSAGE_DDL)
+            _backends[key] = 'tsvector'
+        else:
+            _backends[key] = None
+    except (OperationalError, ProgrammingError) as e:
+        print(f"Warning: message search unavailable, falling back to ILIKE: {e}")
+        _backends[key] = None
+
+
+def init_archived_message_search_index():
+    """Create the archived message search index; returns True if it was just created"""
+    dialect = _dialect()
+    key = (str(db.engine.url), 'message_archive_entries')
+    try:
+        if dialect == 'sqlite':
+            existed = inspect(db.engine).has_table('message_archive_fts')
+            _run_ddl(SQLITE_ARCHIVE_DDL)
+            _backends[key] = 'fts5'
+        elif dialect == 'postgresql':
+            columns = {c['name'] for c in inspect(db.engine).get_columns('message_archive_entries')}
+            existed = 'search_vector' in columns
+            _run_ddl(POSTGRES_ARCHIVE_DDL)
+            _backends[key] = 'tsvector'
+        else:
+            _backends[key] = None
+            return False
+    except (OperationalError, ProgrammingError) as e:
+        print(f"Warning: archived message search unavailable: {e}")
+        _backends[key] = None
+        return False
+    return not existed
+
+
+def archived_message_search_backend():
+    """Return the active archived message search backend for the current database, or None"""
+    key = (str(db.engine.url), 'message_archive_entries')
+    if key not in _backends:
+        dialect = _dialect()
+        if dialect == 'sqlite':
+            _backends[key] = 'fts5' if inspect(db.engine).has_table('message_archive_fts') else None
+        elif dialect == 'postgresql' and inspect(db.engine).has_table('message_archive_entries'):
+            columns = {c['name'] for c in inspect(db.engine).get_columns('message_archive_entries')}
+            _backends[key] = 'tsvector' if 'search_vector' in columns else None
+        else:
+            _backends[key] = None
+    return _backends[key]
+
+
+def index_archived_messages(connection, messages):
+    """Add archived messages to the archive search index.
+
+    Called when messages move into a segment, after their
+    message_archive_entries rows exist and while their text is still at hand.
+    """
+    backend = archived_message_search_backend()
+    rows = [{'id': m.id, 'content': m.content or '', 'subject': m.subject or ''} for m in messages]
+    if not rows or backend is None:
+        return
+    if backend == 'fts5':
+        connection.execute(text(
+            f"INSERT INTO message_archive_fts(rowid, {MESSAGE_FTS_COLUMNS}) VALUES (:id, :content, :subject)"
+        ), rows)
+    else:
+        connection.execute(text(
+            "UPDATE message_archive_entries SET search_vector = "
+            "setweight(to_tsvector('simple', :subject), 'A') || setweight(to_tsvector('simple', :content), 'B') "
+            "WHERE message_id = :id"
+        ), rows)
+
+
+def clear_archived_message_search_index(connection):
+    """Drop every archived message from the search index, before reindexing"""
+    backend = archived_message_search_backend()
+    if backend == 'fts5':
+        connection.execute(text("INSERT INTO message_archive_fts(message_archive_fts) VALUES ('delete-all')"))
+    elif backend == 'tsvector':
+        connection.execute(text("UPDATE message_archive_entries SET search_vector = NULL"))
+
+
+def rebuild_message_search_index():
+    """Repopulate the message search index from the messages table"""
+    dialect = _dialect()
+    if dialect == 'sqlite':
+        _run_ddl(["INSERT INTO message_fts(message_fts) VALUES ('rebuild')"])
+    elif dialect == 'postgresql':
+        _run_ddl(["REINDEX INDEX ix_message_search_vector"])
+
+
+def message_search_backend():
+    """Return the active message search backend for the current database, or None"""
+    key = (str(db.engine.url), 'message')
+    if key not in _backends:
+        dialect = _dialect()
+        if dialect == 'sqlite':
+            _backends[key] = 'fts5' if inspect(db.engine).has_table('message_fts') else None
+        elif dialect == 'postgresql':
+            columns = {c['name'] for c in inspect(db.engine).get_columns('message')}
+            _backends[key] = 'tsvector' if 'search_vector' in columns else None
+        else:
+            _backends[key] = None
+    return _backends[key]
+
+
+def _message_tsquery(tokens):
+    return func.to_tsquery('simple', ' & '.join(f'{token}:*' for token in tokens))
+
+
+def message_search_ranking(term):
+    """Subquery of (message_id, rank) for messages matching ``term``.
+
+    Same matching rules as alumni_search_ranking: every token as a prefix,
+    lower rank is better. Returns None without a usable index or tokens.
+    """
+    return _message_ranking(message_search_backend(), term, 'message_fts', 'message', 'id', 'message_search')
+
+
+def archived_message_search_ranking(term):
+    """Subquery of (message_id, rank) for archived messages matching ``term``"""
+    return _message_ranking(
+        archived_message_search_backend(), term,
+        'message_archive_fts', 'message_archive_entries', 'message_id', 'archive_search'
+    )
+
+
+def _message_ranking(backend, term, fts_table, table, id_column, name):
+    tokens = search_tokens(term)
+    if not tokens or backend is None:
+        return None
+
+    if backend == 'fts5':
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        return text(
+            f"SELECT rowid AS message_id, bm25({fts_table}, 1.0, 2.0) AS rank "
+            f"FROM {fts_table} WHERE {fts_table} MATCH :match"
+        ).bindparams(match=match).columns(message_id=Integer, rank=Float).subquery(name)
+
+    vector = literal_column(f'{table}.search_vector')
+    query = _message_tsquery(tokens)
+    return select(
+        literal_column(f'{table}.{id_column}', Integer).label('message_id'),
+        (-func.ts_rank(vector, query)).label('rank')
+    ).select_from(text(table)).where(vector.op('@@')(query)).subquery(name)
+
+
+def message_snippets(message_ids, term):
+    """{message_id: highlighted excerpt} for one page of search results.
+
+    Excerpts are raw message text with SNIPPET_START/STOP around matches;
+    clients must escape the text before rendering the markup.
+    """
+    tokens = search_tokens(term)
+    backend = message_search_backend()
+    if not message_ids or not tokens or backend is None:
+        return {}
+
+    if backend == 'fts5':
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        statement = text(
+            "SELECT rowid, snippet(message_fts, -1, :start, :stop, :ellipsis, :words) "
+            "FROM message_fts WHERE message_fts MATCH :match AND rowid IN :ids"
+        ).bindparams(
+            bindparam('ids', expanding=True),
+            match=match, ids=list(message_ids), start=SNIPPET_START, stop=SNIPPET_STOP,
+            ellipsis=SNIPPET_ELLIPSIS, words=SNIPPET_WORDS
+        )
+        return dict(db.session.execute(statement).all())
+
+    # Subject and body, like the indexed vector, so subject-only hits are highlighted too
+    document = literal_column("coalesce(message.subject, '') || ' ' || coalesce(message.content, '')")
+    options = f'StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxWords={SNIPPET_WORDS * 2}, MinWords={SNIPPET_WORDS // 2}'
+    statement = select(
+        literal_column('message.id', Integer),
+        func.ts_headline('simple', document, _message_tsquery(tokens), options)
+    ).select_from(text('message')).where(literal_column('message.id', Integer).in_(list(message_ids)))
+    return dict(db.session.execute(statement).all())
+
+
+def text_snippet(content, term):
+    """Highlighted excerpt of ``content`` around the first match of ``term``.
+
+    For archived messages, whose index has no text to build snippets from;
+    same markup and size as message_snippets.
+    """
+    tokens = search_tokens(term)
+    words = (content or '').split()
+    hits = [i for i, word in enumerate(words) if any(t.startswith(tok) for t in search_tokens(word) for tok in tokens)]
+    if not hits:
+        return ' '.join(words[:SNIPPET_WORDS])
+    start = max(hits[0] - SNIPPET_WORDS // 2, 0)
+    hits = set(hits)
+    end = min(start + SNIPPET_WORDS, len(words))
+    excerpt = [
+        f'{SNIPPET_START}{word}{SNIPPET_STOP}' if index in hits else word
+        for index, word in enumerate(words[start:end], start=start)
+    ]
+    return (SNIPPET_ELLIPSIS if start > 0 else '') + ' '.join(excerpt) + (SNIPPET_ELLIPSIS if end < len(words) else '')
@@ -0,0 +1,214 @@
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import namedtuple
+
+# Offline location normalization and geohash helpers.
+#
+# Free-text locations are resolved against a bundled gazetteer
+# (src/data/gazetteer.json) to a canonical place with coordinates, which are
+# stored on the alumni row together with a geohash. Nearby rows share a
+# geohash prefix, so radius searches and map clusters become prefix range
+# scans on an ordinary B-tree index.
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'gazetteer.json')
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+GEOHASH_PRECISION = 8  # ~38m x 19m cells, far finer than city-level places
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+SEGMENT_SPLIT = re.compile(r'[,/;|()]+')
+
+
+class Place(namedtuple('Place', 'name region country latitude longitude')):
+    __slots__ = ()
+
+    @property
+    def label(self):
+        """Canonical display name, e.g. 'Bengaluru, Karnataka, IN'"""
+        region = self.region if self.region != self.name else ''
+        return ', '.join(part for part in (self.name, region, self.country) if part)
+
+
+def _fold(value):
+    """Lowercase, strip accents and punctuation for gazetteer lookups"""
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    value = value.lower().replace('.', '')
+    return ' '.join(re.sub(r'[^\w\s-]', ' ', value).split())
+
+
+class Gazetteer:
+    """Lookup table from folded names and aliases to places"""
+
+    def __init__(self, data):
+        self.places = []
+        self._by_key = {}
+        self._country_keys = {}
+
+        for code, aliases in data.get('country_aliases', {}).items():
+            for alias in [code] + aliases:
+                self._country_keys[_fold(alias)] = code
+
+        for entry in data.get('places', []):
+            place = Place(entry['name'], entry.get('region') or '', entry['country'],
+                          entry['lat'], entry['lon'])
+            self.places.append(place)
+            for key in [entry['name']] + entry.get('aliases', []):
+                self._by_key.setdefault(_fold(key), []).append(place)
+
+    @classmethod
+    def load(cls, path=GAZETTEER_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _pick(self, candidates, hints):
+        for place in candidates:
+            if _fold(place.region) in hints or place.country in hints:
+                return place
+        return candidates[0]
+
+    def resolve(self, text):
+        """Best matching Place for a free-text location, or None"""
+        segments = [_fold(s) for s in SEGMENT_SPLIT.split(text or '')]
+        segments = [s for s in segments if s]
+        if not segments:
+            return None
+
+        hints = set(segments)
+        hints.update(self._country_keys[s] for s in segments if s in self._country_keys)
+
+        # Whole string first ("new york city"), then each segment left to right
+        # so "Palo Alto, California, USA" resolves to the most specific part
+        for key in [' '.join(segments)] + segments:
+            candidates = self._by_key.get(key)
+            if candidates:
+                return self._pick(candidates, hints)
+        return None
+
+
+_gazetteer = None
+
+
+def get_gazetteer():
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer.load()
+    return _gazetteer
+
+
+def resolve_location(*texts):
+    """Resolve the first of ``texts`` that names a known place"""
+    gazetteer = get_gazetteer()
+    for text in texts:
+        place = gazetteer.resolve(text)
+        if place is not None:
+            return place
+    return None
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(chars)
+
+
+def geohash_prefix_end(prefix):
+    """Smallest geohash-alphabet string sorting after every geohash starting with ``prefix``.
+
+    The last character that can be bumped moves to the next alphabet
+    character (trailing 'z's carry into the previous one). Digits sort before
+    letters, and letters sort alphabetically, under byte and locale-aware
+    collations alike, so the bound also holds on non-C Postgres collations.
+    Returns None when no bound exists (an empty or all-'z' prefix).
+    """
+    prefix = prefix.rstrip(GEOHASH_ALPHABET[-1])
+    if not prefix:
+        return None
+    return prefix[:-1] + GEOHASH_ALPHABET[GEOHASH_ALPHABET.index(prefix[-1]) + 1]
+
+
+def geohash_cell_size(precision):
+    """(lat_degrees, lon_degrees) spanned by one cell at ``precision``"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(south, west, north, east) enclosing the circle; longitudes are not wrapped"""
+    d_lat = radius_km / KM_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    d_lon = min(180.0, radius_km / (KM_PER_DEGREE * cos_lat))
+    return (max(-90.0, latitude - d_lat), longitude - d_lon,
+            min(90.0, latitude + d_lat), longitude + d_lon)
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """Geohash prefixes whose cells together cover the circle.
+
+    Uses the finest precision whose cells are at least as large as the
+    radius, then the centre cell and its eight neighbours.
+    """
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    precision = 0
+    for candidate in range(1, GEOHASH_PRECISION + 1):
+        lat_size, lon_size = geohash_cell_size(candidate)
+        if lat_size * KM_PER_DEGREE < radius_km or lon_size * KM_PER_DEGREE * cos_lat < radius_km:
+            break
+        precision = candidate
+    if precision == 0:
+        return ['']  # Radius larger than a top-level cell; every geohash matches
+
+    lat_size, lon_size = geohash_cell_size(precision)
+    cells = set()
+    for d_lat in (-lat_size, 0, lat_size):
+        lat = latitude + d_lat
+        if lat < -90 or lat > 90:
+            continue
+        for d_lon in (-lon_size, 0, lon_size):
+            lon = (longitude + d_lon + 180) % 360 - 180
+            cells.add(geohash_encode(lat, lon, precision))
+    return sorted(cells)
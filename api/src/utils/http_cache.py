@@ -0,0 +1,54 @@
+import hashlib
+from flask import current_app, request
+
+# Conditional GET for detail endpoints.
+#
+# Views compute a weak ETag and a Last-Modified time from cheap inputs
+# (updated_at columns, related-row counters, the viewer id when the payload
+# is personalized) and return 304 before doing any serialization when the
+# client's copy is still current. The tags are weak: the payload is
+# semantically the same for a given tag but not byte-for-byte guaranteed.
+
+
+def make_etag(*parts):
+    """Weak entity tag value hashed from the validator ``parts``"""
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+
+def latest(*timestamps):
+    """Most recent of the given datetimes, ignoring None"""
+    present = [ts for ts in timestamps if ts is not None]
+    return max(present) if present else None
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Cacheable by the browser only, and always revalidated
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    """A 304 response if the request's validators match, else None.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted when
+    the client sent no entity tags (RFC 9110 section 13.2.2).
+    """
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified is not None:
+        matched = last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    else:
+        matched = False
+
+    if not matched:
+        return None
+    return _set_validators(current_app.response_class(status=304), etag, last_modified)
+
+
+def with_validators(response, etag, last_modified=None):
+    """Attach ETag, Last-Modified and Cache-Control to a full response"""
+    return _set_validators(response, etag, last_modified)
@@ -0,0 +1,142 @@
+from collections import defaultdict
+from datetime import datetime
+from src.models.user import db, User
+from src.models.alumni import Alumni, skill_names
+from src.models.student import Student
+from src.models.skill import normalize_skill
+from src.models.mentor_match import MentorMatch
+from src.models.batch_run import BatchRun
+from src.utils.vectorize import FeatureSpace, top_k_similar, NUMPY_AVAILABLE
+
+JOB_NAME = 'mentor_matches'
+MATCHES_PER_STUDENT = 10
+
+# Relative weight of each kind of shared term
+TERM_WEIGHTS = {'skill': 1.0, 'topic': 1.5, 'industry': 1.0}
+
+
+def _terms(kind, values):
+    return [f'{kind}:{normalize_skill(value)}' for value in skill_names(values)]
+
+
+def student_terms(row):
+    interests = row.career_interests or []
+    return _terms('skill', row.skills) + _terms('topic', interests) + _terms('industry', interests)
+
+
+def mentor_terms(row):
+    return (
+        _terms('skill', row.skills) +
+        _terms('topic', row.mentor_categories) +
+        _terms('industry', [row.industry] if row.industry else [])
+    )
+
+
+# Sentinel for "every institution"
+ALL = object()
+
+
+def _in_institution(query, institution_id):
+    if institution_id is ALL:
+        return query
+    if institution_id is None:
+        return query.filter(User.institution_id.is_(None))
+    return query.filter(User.institution_id == institution_id)
+
+
+def _mentor_rows(institution_id=ALL):
+    query = db.session.query(
+        Alumni.id, Alumni.skills, Alumni.mentor_categories, Alumni.industry, User.institution_id
+    ).join(User, User.id == Alumni.user_id).filter(Alumni.is_mentor == True)
+    return _in_institution(query, institution_id).all()
+
+
+def _student_rows(institution_id=ALL):
+    query = db.session.query(
+        Student.id, Student.skills, Student.career_interests, Student.updated_at, User.institution_id
+    ).join(User, User.id == Student.user_id).filter(Student.is_seeking_mentorship == True)
+    return _in_institution(query, institution_id).all()
+
+
+def _drop_ineligible_matches():
+    """Delete stored matches of students no longer seeking mentorship"""
+    seeking = db.session.query(Student.id).filter(Student.is_seeking_mentorship == True)
+    deleted = MentorMatch.query.filter(~MentorMatch.student_id.in_(seeking)).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def _score_and_store(targets, mentors, corpus):
+    """Score ``targets`` against ``mentors`` and replace their stored matches"""
+    student_documents = [student_terms(row) for row in targets]
+    mentor_documents = [mentor_terms(row) for row in mentors]
+    space = FeatureSpace(
+        [student_terms(row) for row in corpus] + mentor_documents,
+        weights=TERM_WEIGHTS
+    )
+    
+    now = datetime.utcnow()
+    rows = []
+    for student_index, best in top_k_similar(
+        space.transform(student_documents), space.transform(mentor_documents), MATCHES_PER_STUDENT
+    ):
+        student_id = targets[student_index].id
+        for rank, (mentor_index, score) in enumerate(best, start=1):
+            rows.append({
+                'student_id': student_id,
+                'alumni_id': mentors[mentor_index].id,
+                'score': score,
+                'rank': rank,
+                'computed_at': now
+            })
+    
+    MentorMatch.query.filter(MentorMatch.student_id.in_([row.id for row in targets])).delete(synchronize_session=False)
+    if rows:
+        db.session.execute(MentorMatch.__table__.insert(), rows)
+    db.session.commit()
+    return len(targets)
+
+
+def refresh_mentor_matches(full=False):
+    """Recompute stored matches for students whose inputs changed since the last run.
+    
+    Any change to an institution's alumni (e.g. a new mentor) rescores every
+    seeking student of that institution; otherwise only students updated
+    since the last run are rescored. Matches of students who stopped seeking
+    mentorship are dropped. Returns the number of students scored.
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError('numpy is required for mentor matching')
+    
+    started_at = datetime.utcnow()
+    since = None if full else BatchRun.get_watermark(JOB_NAME)
+    
+    changed_institutions = None
+    if since is not None:
+        changed_institutions = {
+            institution_id for (institution_id,) in db.session.query(User.institution_id).join(
+                Alumni, Alumni.user_id == User.id
+            ).filter(Alumni.updated_at > since).distinct()
+        }
+    
+    mentors_by_institution = defaultdict(list)
+    for row in _mentor_rows():
+        mentors_by_institution[row.institution_id].append(row)
+    students_by_institution = defaultdict(list)
+    for row in _student_rows():
+        students_by_institution[row.institution_id].append(row)
+    
+    _drop_ineligible_matches()
+    
+    scored = 0
+    for institution_id, students in students_by_institution.items():
+        if since is None or institution_id in changed_institutions:
+            targets = students
+        else:
+            targets = [row for row in students if row.updated_at and row.updated_at > since]
+        if targets:
+            scored += _score_and_store(targets, mentors_by_institution.get(institution_id, []), students)
+    
+    BatchRun.record(JOB_NAME, started_at, processed=scored)
+    return scored
+
@@ -0,0 +1,109 @@
+import base64
+import json
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client supplies a cursor we did not issue"""
+
+
+def get_page_size(requested, default=DEFAULT_PAGE_SIZE, max_setting='MAX_PAGE_SIZE'):
+    """Clamp a requested page size to the configured cap"""
+    max_size = current_app.config.get(max_setting, DEFAULT_MAX_PAGE_SIZE)
+    try:
+        size = int(requested) if requested is not None else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, max_size))
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row on a page into an opaque token"""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, expected_length):
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Malformed cursor')
+    if not isinstance(values, list) or len(values) != expected_length:
+        raise InvalidCursor('Cursor does not match the requested sort order')
+    try:
+        return [_decode_value(v) for v in values]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor('Malformed cursor')
+
+
+def _after(columns, descending, values):
+    """Build the keyset predicate "row sorts after (values)".
+
+    Expanded as (a > x) OR (a = x AND b > y) ... so every dialect can use a
+    composite index on the sort columns; NULL sort values are not supported.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        prefix = [columns[j] == values[j] for j in range(i)]
+        step = column < values[i] if descending[i] else column > values[i]
+        clauses.append(and_(*prefix, step))
+    return or_(*clauses)
+
+
+def after_cursor(sort_keys, cursor):
+    """Predicate selecting the rows that sort after ``cursor`` in ``sort_keys`` order.
+
+    Useful for pushing the cursor into subqueries (e.g. each branch of a
+    UNION) that keyset_paginate then pages over.
+    """
+    columns = [column for column, _ in sort_keys]
+    values = decode_cursor(cursor, len(columns))
+    return _after(columns, [desc for _, desc in sort_keys], values)
+
+
+def keyset_paginate(query, sort_keys, cursor=None, limit=DEFAULT_PAGE_SIZE, row_key=None):
+    """Fetch one page of ``query`` ordered by ``sort_keys``.
+
+    ``sort_keys`` is a list of ``(column, descending)`` pairs and must end with
+    a unique column (usually the primary key) so the order is total.
+    ``row_key`` maps a result row to its sort values; by default the column
+    names are read as attributes of the row. Returns ``(items, next_cursor)``.
+    """
+    columns = [column for column, _ in sort_keys]
+
+    if cursor:
+        query = query.filter(after_cursor(sort_keys, cursor))
+
+    query = query.order_by(*[c.desc() if d else c.asc() for c, d in sort_keys])
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if row_key is None:
+            values = [getattr(last, column.key) for column in columns]
+        else:
+            values = row_key(last)
+        next_cursor = encode_cursor(values)
+
+    return rows, next_cursor
@@ -0,0 +1,222 @@
+import heapq
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from src.models.user import db, User
+from src.models.alumni import Alumni, skill_names
+from src.models.skill import normalize_skill
+from src.models.alumni_recommendation import AlumniRecommendation
+from src.models.batch_run import BatchRun
+from src.utils.vectorize import FeatureSpace, similarity_blocks, best_columns, NUMPY_AVAILABLE
+
+# "People you may know": alumni of the same institution ranked by cosine
+# similarity of their department, company, skills and graduation year.
+
+JOB_NAME = 'alumni_recommendations'
+RECOMMENDATIONS_PER_ALUMNI = 20
+YEAR_TERM_SPREAD = 1  # Year terms y-1..y+1, so classmates up to two years apart overlap
+MAX_REASON_SKILLS = 5
+IN_CHUNK_SIZE = 500
+
+# Relative weight of each kind of shared term
+TERM_WEIGHTS = {'department': 1.0, 'company': 2.0, 'skill': 1.0, 'year': 0.5}
+
+Profile = namedtuple('Profile', 'id institution_id department company graduation_year skills terms')
+
+
+def _profile(row):
+    department = normalize_skill(row.department) if row.department else None
+    company = normalize_skill(row.current_company) if row.current_company else None
+    skills = {normalize_skill(name): name for name in skill_names(row.skills)}
+
+    terms = [f'skill:{slug}' for slug in skills]
+    if department:
+        terms.append(f'department:{department}')
+    if company:
+        terms.append(f'company:{company}')
+    if row.graduation_year:
+        terms.extend(
+            f'year:{row.graduation_year + offset}'
+            for offset in range(-YEAR_TERM_SPREAD, YEAR_TERM_SPREAD + 1)
+        )
+    return Profile(row.id, row.institution_id, department, company, row.graduation_year, skills, terms)
+
+
+def _profiles():
+    query = db.session.query(
+        Alumni.id, Alumni.department, Alumni.current_company, Alumni.graduation_year,
+        Alumni.skills, User.institution_id
+    ).join(User, User.id == Alumni.user_id)
+    return [_profile(row) for row in query.order_by(Alumni.id)]
+
+
+def shared_reasons(profile, other):
+    """What two profiles have in common, stored next to the suggestion"""
+    reasons = {}
+    if profile.department and profile.department == other.department:
+        reasons['department'] = True
+    if profile.company and profile.company == other.company:
+        reasons['company'] = True
+    if profile.graduation_year and other.graduation_year:
+        gap = abs(profile.graduation_year - other.graduation_year)
+        if gap <= 2 * YEAR_TERM_SPREAD:
+            reasons['graduation_year_gap'] = gap
+    shared = sorted(set(profile.skills) & set(other.skills))
+    if shared:
+        reasons['skills'] = [other.skills[slug] for slug in shared[:MAX_REASON_SKILLS]]
+    return reasons
+
+
+def _chunks(values, size=IN_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _stored_lists(alumni_ids):
+    lists = defaultdict(dict)
+    for chunk in _chunks(alumni_ids):
+        for alumni_id, recommended_id, score in db.session.query(
+            AlumniRecommendation.alumni_id, AlumniRecommendation.recommended_id, AlumniRecommendation.score
+        ).filter(AlumniRecommendation.alumni_id.in_(chunk)):
+            lists[alumni_id][recommended_id] = score
+    return lists
+
+
+def _holders_of(alumni_ids):
+    holders = set()
+    for chunk in _chunks(alumni_ids):
+        holders.update(alumni_id for (alumni_id,) in db.session.query(
+            AlumniRecommendation.alumni_id
+        ).filter(AlumniRecommendation.recommended_id.in_(chunk)))
+    return holders
+
+
+def _score(matrix, targets, collect_candidates=False):
+    """Top suggestions for each target row, optionally with candidates for every row.
+
+    Candidates are each row's best-scoring targets, kept in a heap bounded
+    to RECOMMENDATIONS_PER_ALUMNI: a target outside that bound cannot make
+    the row's final list either. Returns ({target: [(row, score)]},
+    {row: [(score, target)]}).
+    """
+    best_lists = {}
+    candidates = defaultdict(list)
+    for start, scores in similarity_blocks(matrix[targets], matrix):
+        block_targets = targets[start:start + scores.shape[0]]
+        for offset, target in enumerate(block_targets):
+            scores[offset, target] = -1.0
+        if collect_candidates:
+            for offset, column in zip(*(scores > 0).nonzero()):
+                heap = candidates[int(column)]
+                item = (float(scores[offset, column]), block_targets[offset])
+                if len(heap) < RECOMMENDATIONS_PER_ALUMNI:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        for target, best in zip(block_targets, best_columns(scores, RECOMMENDATIONS_PER_ALUMNI)):
+            best_lists[target] = best
+    return best_lists, candidates
+
+
+def _store(profiles, lists, computed_at):
+    """Replace the stored suggestions of every alumni in ``lists``"""
+    rows = []
+    for index, best in lists.items():
+        profile = profiles[index]
+        for rank, (other, score) in enumerate(best, start=1):
+            rows.append({
+                'alumni_id': profile.id,
+                'recommended_id': profiles[other].id,
+                'score': score,
+                'rank': rank,
+                'reasons': shared_reasons(profile, profiles[other]),
+                'computed_at': computed_at
+            })
+
+    for chunk in _chunks(profiles[index].id for index in lists):
+        AlumniRecommendation.query.filter(AlumniRecommendation.alumni_id.in_(chunk)).delete(synchronize_session=False)
+    if rows:
+        db.session.execute(AlumniRecommendation.__table__.insert(), rows)
+    db.session.commit()
+
+
+def _refresh_institution(profiles, changed_ids=None):
+    """Rescore one institution's alumni and return how many lists were rewritten.
+
+    With ``changed_ids`` only those alumni are rescored against everyone, and
+    their new scores are folded into the stored lists of the other alumni. A
+    full list that loses one of the changed alumni is recomputed, since its
+    replacement is unknown. Term weights are not refreshed for untouched
+    pairs; a periodic full run re-levels them.
+    """
+    if not profiles:
+        return 0
+
+    documents = [profile.terms for profile in profiles]
+    matrix = FeatureSpace(documents, weights=TERM_WEIGHTS).transform(documents)
+    index_of = {profile.id: index for index, profile in enumerate(profiles)}
+
+    if changed_ids is None:
+        targets = list(range(len(profiles)))
+    else:
+        targets = sorted(index_of[alumni_id] for alumni_id in changed_ids if alumni_id in index_of)
+    if not targets:
+        return 0
+
+    incremental = changed_ids is not None
+    lists, candidates = _score(matrix, targets, collect_candidates=incremental)
+
+    if incremental:
+        changed = {profiles[target].id for target in targets}
+        affected = (set(candidates) | {index_of[i] for i in _holders_of(changed) if i in index_of}) - set(targets)
+        stored = _stored_lists(profiles[index].id for index in affected)
+        recompute = []
+        for index in affected:
+            old = stored.get(profiles[index].id, {})
+            new = {profiles[t].id: score for score, t in candidates.get(index, [])}
+            dropped = any(new.get(alumni_id, 0.0) < score for alumni_id, score in old.items() if alumni_id in changed)
+            if dropped and len(old) >= RECOMMENDATIONS_PER_ALUMNI:
+                recompute.append(index)
+                continue
+            merged = {alumni_id: score for alumni_id, score in old.items() if alumni_id not in changed}
+            merged.update(new)
+            best = sorted(merged.items(), key=lambda item: (-item[1], item[0]))[:RECOMMENDATIONS_PER_ALUMNI]
+            lists[index] = [(index_of[alumni_id], score) for alumni_id, score in best if alumni_id in index_of]
+        if recompute:
+            recomputed, _ = _score(matrix, sorted(recompute))
+            lists.update(recomputed)
+
+    _store(profiles, lists, datetime.utcnow())
+    return len(lists)
+
+
+def refresh_alumni_recommendations(full=False):
+    """Refresh stored suggestions for alumni whose profiles changed since the last run.
+
+    Returns the number of alumni whose suggestion lists were rewritten.
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError('numpy is required for alumni recommendations')
+
+    started_at = datetime.utcnow()
+    since = None if full else BatchRun.get_watermark(JOB_NAME)
+
+    changed_ids = None
+    if since is not None:
+        changed_ids = {alumni_id for (alumni_id,) in db.session.query(Alumni.id).filter(Alumni.updated_at > since)}
+
+    by_institution = defaultdict(list)
+    if changed_ids is None or changed_ids:
+        for profile in _profiles():
+            by_institution[profile.institution_id].append(profile)
+
+    refreshed = 0
+    for profiles in by_institution.values():
+        if changed_ids is None:
+            refreshed += _refresh_institution(profiles)
+        elif any(profile.id in changed_ids for profile in profiles):
+            refreshed += _refresh_institution(profiles, changed_ids)
+
+    BatchRun.record(JOB_NAME, started_at, processed=refreshed)
+    return refreshed
+
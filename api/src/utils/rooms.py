@@ -0,0 +1,24 @@
+# Socket.IO room access.
+#
+# Server-managed rooms carry private pushes: user_<id> gets one user's unread
+# counts and notifications, institution_<id> gets an institution's
+# announcements. The connect handler joins a user to their own; clients may
+# only (re)join those, never anyone else's. Conversation rooms
+# (conversation_<low>_<high>) are open to their two participants.
+
+PERSONAL_PREFIX = 'user_'
+INSTITUTION_PREFIX = 'institution_'
+
+
+def can_join_room(user, room, room_type='conversation'):
+    """Whether ``user`` may join ``room`` on request"""
+    if not isinstance(room, str) or not room:
+        return False
+    if room.startswith(PERSONAL_PREFIX):
+        return room == f'{PERSONAL_PREFIX}{user.id}'
+    if room.startswith(INSTITUTION_PREFIX):
+        return user.institution_id is not None and room == f'{INSTITUTION_PREFIX}{user.institution_id}'
+    if room_type == 'conversation':
+        # Format: "conversation_<low>_<high>"
+        return str(user.id) in room.split('_')[1:]
+    return True
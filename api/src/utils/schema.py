@@ -0,0 +1,106 @@
+from sqlalchemy import inspect, text
+from src.models.user import db
+from src.models.alumni import Alumni, recompute_alumni_scores, normalize_alumni_locations
+from src.models.alumni_stats import AlumniStat, rebuild_alumni_stats
+from src.models.skill import AlumniSkill, rebuild_skill_index
+from src.models.message import Message, Conversation, rebuild_conversations
+from src.models.message_archive import MessageArchiveSegment, reindex_archived_messages
+from src.utils.fulltext import init_alumni_search_index, init_message_search_index, init_archived_message_search_index
+from src.utils.trigram import init_name_search
+
+
+def ensure_columns():
+    """Add columns declared on models that are missing from existing tables.
+
+    Columns are added as plain nullable columns; callers backfill them.
+    Returns the (table, column) pairs that were added.
+    """
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    added = []
+
+    for table in db.metadata.tables.values():
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as connection:
+                connection.execute(text(
+                    f'ALTER TABLE {preparer.format_table(table)} '
+                    f'ADD COLUMN {preparer.format_column(column)} {column_type}'
+                ))
+            added.append((table.name, column.name))
+
+    return added
+
+
+def ensure_indexes():
+    """Create indexes declared on models that are missing from existing tables.
+
+    db.create_all() only emits CREATE INDEX for tables it creates, so indexes
+    added to a model after its table exists would otherwise never be built.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+
+    for table in db.metadata.tables.values():
+        if table.name not in existing_tables:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name and index.name not in existing:
+                index.create(bind=db.engine)
+
+
+# Indexes that earlier versions created and a composite index now covers
+OBSOLETE_INDEXES = {
+    'alumni': ['ix_alumni_networking_score', 'ix_alumni_profile_completeness'],
+}
+
+
+def drop_obsolete_indexes():
+    """Drop indexes the models no longer declare, so writes stop maintaining them"""
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    for table_name, names in OBSOLETE_INDEXES.items():
+        if not inspector.has_table(table_name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table_name)}
+        for name in names:
+            if name in existing:
+                with db.engine.begin() as connection:
+                    connection.execute(text(f'DROP INDEX {preparer.quote(name)}'))
+
+
+def upgrade_schema():
+    """Bring an existing database up to date with the current models"""
+    added = ensure_columns()
+    ensure_indexes()
+    drop_obsolete_indexes()
+    init_alumni_search_index()
+    init_message_search_index()
+    archive_index_created = init_archived_message_search_index()
+    init_name_search()
+
+    # Backfill materialized columns introduced after the table was created
+    if ('alumni', 'networking_score') in added:
+        recompute_alumni_scores()
+    if ('alumni', 'geohash') in added:
+        normalize_alumni_locations()
+
+    # Populate rollup tables created after alumni already existed
+    if Alumni.query.first() is not None:
+        if AlumniStat.query.first() is None:
+            rebuild_alumni_stats()
+        if AlumniSkill.query.first() is None:
+            rebuild_skill_index()
+    if Message.query.first() is not None and (
+        Conversation.query.first() is None or
+        ('message', 'conversation_id') in added or ('conversations', 'read_low_id') in added
+    ):
+        rebuild_conversations()
+    if archive_index_created and MessageArchiveSegment.query.first() is not None:
+        reindex_archived_messages()
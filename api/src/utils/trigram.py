@@ -0,0 +1,192 @@
+import re
+import threading
+import time
+from collections import Counter
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from src.models.user import db
+from src.models.alumni import Alumni
+
+# Typo-tolerant alumni name search.
+#
+# Postgres uses pg_trgm with a GIN trigram index on the full name. Other
+# databases (SQLite locally) use an in-process trigram posting-list index
+# that is built lazily, kept current by Alumni mapper events in this process
+# and rebuilt after INDEX_TTL seconds to pick up writes from other workers.
+
+SIMILARITY_THRESHOLD = 0.3  # Same default as pg_trgm
+INDEX_TTL = 600
+
+WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_alumni_full_name_trgm ON alumni "
+    "USING GIN ((first_name || ' ' || last_name) gin_trgm_ops)",
+]
+
+# Database URLs where pg_trgm is installed
+_pg_trgm_ready = set()
+
+
+def trigrams(value):
+    """pg_trgm-compatible trigram set: words lowercased and padded '  word '"""
+    grams = set()
+    for word in WORD_PATTERN.findall((value or '').lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """In-process trigram posting lists over alumni full names"""
+
+    def __init__(self, ttl=INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._grams = {}
+        self._built_at = None
+
+    def _add(self, alumni_id, name):
+        grams = trigrams(name)
+        self._grams[alumni_id] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(alumni_id)
+
+    def _remove(self, alumni_id):
+        for gram in self._grams.pop(alumni_id, ()):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(alumni_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def build(self, rows):
+        with self._lock:
+            self._postings = {}
+            self._grams = {}
+            for alumni_id, first_name, last_name in rows:
+                self._add(alumni_id, f'{first_name} {last_name}')
+            self._built_at = time.monotonic()
+
+    def is_stale(self):
+        return self._built_at is None or time.monotonic() - self._built_at > self.ttl
+
+    def update(self, alumni_id, name):
+        with self._lock:
+            if self._built_at is not None:
+                self._remove(alumni_id)
+                self._add(alumni_id, name)
+
+    def remove(self, alumni_id):
+        with self._lock:
+            if self._built_at is not None:
+                self._remove(alumni_id)
+
+    def search(self, query, limit=10, threshold=SIMILARITY_THRESHOLD, deadline=None):
+        """Return [(alumni_id, similarity)] best first.
+
+        Posting lists are merged rarest first, so if ``deadline`` (a
+        time.monotonic() value) passes mid-search the most selective
+        trigrams have already been counted.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        with self._lock:
+            postings = sorted(
+                (self._postings.get(gram, ()) for gram in query_grams), key=len
+            )
+            hits = Counter()
+            for posting in postings:
+                hits.update(posting)
+                if deadline is not None and time.monotonic() > deadline:
+                    break
+
+            scored = []
+            for alumni_id, shared in hits.items():
+                grams = self._grams.get(alumni_id)
+                if not grams:
+                    continue
+                similarity = shared / (len(query_grams) + len(grams) - shared)
+                if similarity >= threshold:
+                    scored.append((alumni_id, similarity))
+
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+
+name_index = TrigramIndex()
+
+
+def init_name_search():
+    """Install pg_trgm and the trigram index on Postgres"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    try:
+        with db.engine.begin() as connection:
+            for statement in POSTGRES_DDL:
+                connection.execute(text(statement))
+        _pg_trgm_ready.add(str(db.engine.url))
+    except (OperationalError, ProgrammingError) as e:
+        print(f"Warning: pg_trgm unavailable, using in-process name index: {e}")
+
+
+def _uses_pg_trgm():
+    key = str(db.engine.url)
+    if db.engine.dialect.name != 'postgresql':
+        return False
+    if key not in _pg_trgm_ready:
+        installed = db.session.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).scalar()
+        if installed:
+            _pg_trgm_ready.add(key)
+    return key in _pg_trgm_ready
+
+
+def fuzzy_name_search(query, limit=10, budget_ms=50):
+    """Alumni whose full name is similar to ``query``: [(alumni_id, similarity)]"""
+    if _uses_pg_trgm():
+        full_name = Alumni.first_name + ' ' + Alumni.last_name
+        similarity = db.func.similarity(full_name, query)
+        try:
+            db.session.execute(text(f"SET LOCAL statement_timeout = {int(budget_ms)}"))
+            rows = db.session.execute(
+                select(Alumni.id, similarity.label('similarity'))
+                .where(full_name.op('%')(query))
+                .order_by(similarity.desc(), Alumni.id)
+                .limit(limit)
+            ).all()
+            db.session.execute(text("SET LOCAL statement_timeout = DEFAULT"))
+        except OperationalError:
+            # Over budget; an empty suggestion list beats a slow search box
+            db.session.rollback()
+            return []
+        return [(alumni_id, float(score)) for alumni_id, score in rows]
+
+    if name_index.is_stale():
+        name_index.build(db.session.execute(
+            select(Alumni.id, Alumni.first_name, Alumni.last_name)
+        ).all())
+    deadline = time.monotonic() + budget_ms / 1000.0
+    return name_index.search(query, limit=limit, deadline=deadline)
+
+
+@event.listens_for(Alumni, 'after_insert')
+def _index_new_name(mapper, connection, target):
+    name_index.update(target.id, target.get_full_name())
+
+
+@event.listens_for(Alumni, 'after_update')
+def _reindex_changed_name(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.first_name.history.has_changes() or state.attrs.last_name.history.has_changes():
+        name_index.update(target.id, target.get_full_name())
+
+
+@event.listens_for(Alumni, 'after_delete')
+def _unindex_deleted_name(mapper, connection, target):
+    name_index.remove(target.id)
@@ -0,0 +1,30 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+# The app runs on Postgres in production and SQLite locally; both support
+# INSERT ... ON CONFLICT, which keeps counters and dictionaries race-free.
+_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def upsert(connection, table, rows, index_elements, update=None):
+    """INSERT ``rows`` into ``table``, resolving conflicts on ``index_elements``.
+
+    ``update`` maps column names to callables receiving the ``excluded`` row
+    and returning the new value, e.g. ``{'count': lambda ex: table.c.count + ex.count}``.
+    Without it conflicting rows are left untouched (ON CONFLICT DO NOTHING).
+    """
+    insert = _INSERTS.get(connection.dialect.name)
+    if insert is None:
+        raise NotImplementedError(f'upsert is not supported on {connection.dialect.name}')
+
+    statement = insert(table).values(rows)
+    if update:
+        statement = statement.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={column: value(statement.excluded) for column, value in update.items()}
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=index_elements)
+    return connection.execute(statement)
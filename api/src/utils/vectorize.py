@@ -0,0 +1,112 @@
+import math
+from collections import Counter
+
+# Try to import numpy (installed with pandas); matching features need it
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("Warning: numpy not available. Matching and recommendations disabled.")
+
+# scipy keeps the feature matrices sparse; dense numpy is the fallback
+try:
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+class FeatureSpace:
+    """TF-IDF weighted one-hot feature space over profile terms.
+    
+    Terms are strings of the form "kind:value" (e.g. "skill:python"); the
+    ``weights`` mapping scales each kind. Rows are L2-normalized so a matrix
+    product of two transformed sets gives cosine similarities.
+    """
+    
+    def __init__(self, documents, weights=None):
+        document_frequency = Counter()
+        count = 0
+        for terms in documents:
+            document_frequency.update(set(terms))
+            count += 1
+        
+        self.weights = weights or {}
+        self.vocabulary = {term: index for index, term in enumerate(sorted(document_frequency))}
+        self.idf = [0.0] * len(self.vocabulary)
+        for term, index in self.vocabulary.items():
+            kind = term.split(':', 1)[0]
+            self.idf[index] = (math.log((1 + count) / (1 + document_frequency[term])) + 1) * self.weights.get(kind, 1.0)
+    
+    def transform(self, documents):
+        """Matrix with one normalized row per document (sparse when scipy is installed)"""
+        rows, columns, values = [], [], []
+        n_rows = 0
+        for row, terms in enumerate(documents):
+            n_rows += 1
+            indices = sorted({self.vocabulary[term] for term in terms if term in self.vocabulary})
+            norm = math.sqrt(sum(self.idf[i] ** 2 for i in indices)) or 1.0
+            for i in indices:
+                rows.append(row)
+                columns.append(i)
+                values.append(self.idf[i] / norm)
+        
+        shape = (n_rows, max(len(self.vocabulary), 1))
+        if SCIPY_AVAILABLE:
+            return sparse.csr_matrix((values, (rows, columns)), shape=shape, dtype=np.float32)
+        matrix = np.zeros(shape, dtype=np.float32)
+        matrix[rows, columns] = values
+        return matrix
+
+
+def similarity_blocks(left, right, block_size=512):
+    """Yield (start, dense scores) for ``block_size`` left rows at a time.
+    
+    Memory stays bounded at block_size x len(right).
+    """
+    if left.shape[0] == 0 or right.shape[0] == 0:
+        return
+    
+    right_t = right.T
+    for start in range(0, left.shape[0], block_size):
+        block = left[start:start + block_size] @ right_t
+        yield start, block.toarray() if hasattr(block, 'toarray') else np.asarray(block)
+
+
+def best_columns(scores, k):
+    """Per row of a dense score block, the k best positive (column, score) pairs"""
+    k = min(k, scores.shape[1])
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    for offset in range(scores.shape[0]):
+        candidates = best[offset]
+        ordered = candidates[np.argsort(-scores[offset, candidates], kind='stable')]
+        yield [
+            (int(column), float(scores[offset, column]))
+            for column in ordered if scores[offset, column] > 0
+        ]
+
+
+def top_k_similar(left, right, k, block_size=512, exclude_diagonal=False, exclude=None):
+    """Yield (left_row, [(right_row, score), ...]) with the k best positive scores.
+    
+    With ``exclude_diagonal`` (left and right are the same set) a row never
+    matches itself; ``exclude`` generalizes this to a right row index per
+    left row (-1 for none), e.g. when left is a subset of right.
+    """
+    if exclude is None and exclude_diagonal:
+        exclude = range(min(left.shape[0], right.shape[0]))
+    if exclude is not None:
+        exclude = np.asarray(list(exclude), dtype=np.int64)
+    
+    for start, scores in similarity_blocks(left, right, block_size):
+        if exclude is not None:
+            rows = np.arange(scores.shape[0])
+            cols = np.full(scores.shape[0], -1, dtype=np.int64)
+            window = exclude[start:start + scores.shape[0]]
+            cols[:len(window)] = window
+            valid = cols >= 0
+            scores[rows[valid], cols[valid]] = -1.0
+        
+        for offset, best in enumerate(best_columns(scores, k)):
+            yield start + offset, best
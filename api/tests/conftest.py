@@ -0,0 +1,69 @@
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.user import db, User, UserRole, UserStatus
+# Every model, as in src/index.py, so relationships and foreign keys resolve
+from src.models.institution import Institution, DataUploadBatch
+from src.models.invite_token import InviteToken, EmailVerification
+from src.models.alumni import Alumni, AlumniExperience
+from src.models.alumni_stats import AlumniStat
+from src.models.skill import Skill, AlumniSkill
+from src.models.batch_run import BatchRun
+from src.models.mentor_match import MentorMatch
+from src.models.alumni_recommendation import AlumniRecommendation
+from src.models.student import Student, StudentAchievement
+from src.models.event import Event, EventRegistration
+from src.models.message import Message, ForumPost, ForumLike, Conversation
+from src.models.message_archive import MessageArchiveSegment, ArchivedMessage
+from src.models.announcement import Announcement, AnnouncementRead
+from src.models.job import Job, JobApplication
+from src.models.donation import Donation, DonationCampaign
+from src.routes.messages import messages_bp
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App backed by a file SQLite database, so several threads can share it"""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SECRET_KEY='test',
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'test.db'}",
+        SQLALCHEMY_ENGINE_OPTIONS={'connect_args': {'timeout': 30, 'check_same_thread': False}},
+    )
+    db.init_app(app)
+    app.register_blueprint(messages_bp, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def make_users(app):
+    def make_users(count):
+        with app.app_context():
+            users = [
+                User(username=f'user{i}', email=f'user{i}@example.com', role=UserRole.ALUMNI, status=UserStatus.ACTIVE)
+                for i in range(count)
+            ]
+            db.session.add_all(users)
+            db.session.commit()
+            return [user.id for user in users]
+    return make_users
+
+
+@pytest.fixture
+def login(app):
+    def login(user_id):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = user_id
+        return client
+    return login
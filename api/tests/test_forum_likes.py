@@ -0,0 +1,94 @@
+import threading
+
+from src.models.user import db
+from src.models.message import ForumPost, ForumLike
+
+
+def _create_post(app, author_id):
+    with app.app_context():
+        post = ForumPost(author_id=author_id, title='Hot post', content='Everyone likes this')
+        db.session.add(post)
+        db.session.commit()
+        return post.id
+
+
+def _run_concurrently(calls):
+    """Start every call at once and re-raise the first failure"""
+    barrier = threading.Barrier(len(calls))
+    errors = []
+
+    def run(call):
+        try:
+            barrier.wait()
+            call()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(call,)) for call in calls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def _stored_counts(app, post_id):
+    with app.app_context():
+        return (
+            db.session.get(ForumPost, post_id).likes_count,
+            ForumLike.query.filter_by(post_id=post_id).count()
+        )
+
+
+def test_concurrent_likes_and_unlikes_keep_count_in_step(app, make_users, login):
+    user_ids = make_users(24)
+    post_id = _create_post(app, user_ids[0])
+    likers, unlikers, repeater = user_ids[:16], user_ids[16:23], user_ids[23]
+
+    def like(user_id, times=1):
+        def call():
+            client = login(user_id)
+            for _ in range(times):
+                response = client.post(f'/api/forum/posts/{post_id}/like')
+                assert response.status_code == 200, response.data
+        return call
+
+    def like_then_unlike(user_id):
+        def call():
+            client = login(user_id)
+            assert client.post(f'/api/forum/posts/{post_id}/like').status_code == 200
+            for _ in range(2):
+                response = client.delete(f'/api/forum/posts/{post_id}/like')
+                assert response.status_code == 200, response.data
+        return call
+
+    calls = [like(user_id, times=3) for user_id in likers]
+    calls += [like_then_unlike(user_id) for user_id in unlikers]
+    # One user liking from many connections at once
+    calls += [like(repeater) for _ in range(8)]
+    _run_concurrently(calls)
+
+    likes_count, rows = _stored_counts(app, post_id)
+    assert rows == len(likers) + 1
+    assert likes_count == rows
+
+
+def test_like_is_idempotent_and_unlike_reverts(app, make_users, login):
+    user_id, = make_users(1)
+    post_id = _create_post(app, user_id)
+    client = login(user_id)
+
+    assert client.post(f'/api/forum/posts/{post_id}/like').json['likes_count'] == 1
+    assert client.post(f'/api/forum/posts/{post_id}/like').json['likes_count'] == 1
+    posts = client.get('/api/forum/posts').json['posts']
+    assert posts[0]['liked'] is True and posts[0]['likes_count'] == 1
+
+    assert client.delete(f'/api/forum/posts/{post_id}/like').json['likes_count'] == 0
+    assert client.delete(f'/api/forum/posts/{post_id}/like').json['likes_count'] == 0
+    assert _stored_counts(app, post_id) == (0, 0)
+
+
+def test_like_missing_post_is_not_found(app, make_users, login):
+    user_id, = make_users(1)
+    assert login(user_id).post('/api/forum/posts/999/like').status_code == 404
@@ -0,0 +1,31 @@
+from src.models.user import User
+from src.utils.rooms import can_join_room
+
+
+def _user(user_id, institution_id):
+    return User(id=user_id, institution_id=institution_id)
+
+
+def test_cannot_join_another_users_personal_room():
+    user = _user(3, 1)
+    assert can_join_room(user, 'user_3')
+    assert not can_join_room(user, 'user_4')
+    assert not can_join_room(user, 'user_4', room_type='x')
+    assert not can_join_room(user, 'user_34')
+
+
+def test_cannot_join_another_institutions_room():
+    user = _user(3, 1)
+    assert can_join_room(user, 'institution_1')
+    assert not can_join_room(user, 'institution_7')
+    assert not can_join_room(user, 'institution_7', room_type='x')
+    # Matching the user id is not enough
+    assert not can_join_room(user, 'institution_3')
+    assert not can_join_room(_user(3, None), 'institution_None')
+
+
+def test_conversation_rooms_are_limited_to_participants():
+    user = _user(3, 1)
+    assert can_join_room(user, 'conversation_3_9')
+    assert not can_join_room(user, 'conversation_4_9')
+    assert not can_join_room(user, '')